@@ -0,0 +1 @@
+# makes the repo root importable (utils, databases) when running pytest
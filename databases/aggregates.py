@@ -0,0 +1,160 @@
+from datetime import date, datetime, time, timedelta
+
+import pandas as pd
+
+from databases.db_connect import fetch_all
+from databases.rollups import ROLLUP_SOURCES, ROLLUP_TABLES
+
+
+# tables / columns allowed in generated SQL (names cannot be bound as params)
+LOG_TABLES = {
+    "traffic_logs",
+    "accident_logs",
+    "crowd_density_logs",
+    "citizen_complaints",
+    "system_alerts",
+    "aqi_logs",
+    "road_damage_logs",
+}
+FILTER_COLUMNS = {"density_level", "congestion_level", "severity", "aqi_category", "priority"}
+VALUE_COLUMNS = {"aqi", "vehicle_count", "predicted_count"}
+
+DAILY_ROLLUP = ROLLUP_TABLES["daily"]
+
+
+def _check(name, allowed):
+    if name not in allowed:
+        raise ValueError(f"Unknown table/column: {name}")
+    return name
+
+
+def _bounds(start, end):
+    """[start, end] dates → half-open datetime range, so timestamp indexes are used."""
+    return datetime.combine(start, time.min), datetime.combine(end + timedelta(days=1), time.min)
+
+
+def _series(rows, name, cast):
+    # AVG() comes back as Decimal from mysql-connector
+    return pd.Series(
+        {d: cast(v) if v is not None else None for d, v in rows},
+        name=name,
+        dtype="float64" if cast is float else "int64"
+    )
+
+
+# ---------- metric cards ----------
+def count_between(table, start, end, where=None):
+    """
+    COUNT(*) of rows between two dates (inclusive).
+    where → optional {column: value} equality filters
+    """
+    lo, hi = _bounds(start, end)
+    sql = f"SELECT COUNT(*) FROM {_check(table, LOG_TABLES)} WHERE timestamp >= %s AND timestamp < %s"
+    params = [lo, hi]
+
+    for col, val in (where or {}).items():
+        sql += f" AND {_check(col, FILTER_COLUMNS)} = %s"
+        params.append(val)
+
+    rows, _ = fetch_all(sql, params)
+    return int(rows[0][0])
+
+
+def today_counts(day=None):
+    """
+    Every dashboard metric card for one day in a single round trip.
+    Sources with rollups are read from the daily rollup table.
+    """
+    day = day or date.today()
+    lo, hi = _bounds(day, day)
+
+    raw = "SELECT '{key}', COUNT(*) FROM {table} WHERE timestamp >= %s AND timestamp < %s"
+    rolled = (
+        "SELECT '{key}', COALESCE(SUM(event_count), 0) FROM " + DAILY_ROLLUP
+        + " WHERE source = '{table}' AND bucket >= %s AND bucket < %s"
+    )
+
+    parts = [
+        rolled.format(key="traffic_today", table="traffic_logs"),
+        rolled.format(key="accidents_today", table="accident_logs"),
+        rolled.format(key="crowd_high_count", table="crowd_density_logs") + " AND level = 'High'",
+        raw.format(key="complaints_today", table="citizen_complaints"),
+        raw.format(key="alerts_today", table="system_alerts"),
+    ]
+
+    rows, _ = fetch_all(" UNION ALL ".join(parts), [lo, hi] * len(parts))
+    return {key: int(n) for key, n in rows}
+
+
+# ---------- daily trend series ----------
+def daily_counts(table, start, end):
+    """Rows per day between two dates, as a Series indexed by date."""
+    lo, hi = _bounds(start, end)
+
+    if table in ROLLUP_SOURCES:
+        sql = f"""
+        SELECT DATE(bucket) AS day, SUM(event_count)
+        FROM {DAILY_ROLLUP}
+        WHERE source = %s AND bucket >= %s AND bucket < %s
+        GROUP BY day
+        ORDER BY day
+        """
+        params = (table, lo, hi)
+    else:
+        sql = f"""
+        SELECT DATE(timestamp) AS day, COUNT(*)
+        FROM {_check(table, LOG_TABLES)}
+        WHERE timestamp >= %s AND timestamp < %s
+        GROUP BY day
+        ORDER BY day
+        """
+        params = (lo, hi)
+
+    rows, _ = fetch_all(sql, params)
+    return _series(rows, "count", int)
+
+
+def daily_mean(table, column, start, end, city=None):
+    """Daily AVG(column) between two dates, as a Series indexed by date."""
+    lo, hi = _bounds(start, end)
+    col = _check(column, VALUE_COLUMNS)
+    city_sql = " AND city = %s" if city is not None else ""
+    city_params = (city,) if city is not None else ()
+
+    if ROLLUP_SOURCES.get(table, {}).get("columns", {}).get("value") == col:
+        sql = f"""
+        SELECT DATE(bucket) AS day, SUM(value_sum) / NULLIF(SUM(value_count), 0)
+        FROM {DAILY_ROLLUP}
+        WHERE source = %s AND bucket >= %s AND bucket < %s{city_sql}
+        GROUP BY day
+        ORDER BY day
+        """
+        params = (table, lo, hi, *city_params)
+    else:
+        sql = f"""
+        SELECT DATE(timestamp) AS day, AVG({col})
+        FROM {_check(table, LOG_TABLES)}
+        WHERE timestamp >= %s AND timestamp < %s{city_sql}
+        GROUP BY day
+        ORDER BY day
+        """
+        params = (lo, hi, *city_params)
+
+    rows, _ = fetch_all(sql, params)
+    return _series(rows, column, float)
+
+
+# ---------- report breakdowns ----------
+def level_totals(table):
+    """(total, [(level, count), ...]) for a rolled-up log table, all time."""
+    rows, _ = fetch_all(
+        f"""
+        SELECT level, SUM(event_count)
+        FROM {DAILY_ROLLUP}
+        WHERE source = %s
+        GROUP BY level
+        """,
+        (_check(table, set(ROLLUP_SOURCES)),)
+    )
+    rows = [(level, int(n)) for level, n in rows]
+    return sum(n for _, n in rows), rows
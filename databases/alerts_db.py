@@ -1,18 +1,9 @@
 import uuid
 from datetime import datetime
-import streamlit as st
-import mysql.connector
-import os
+
+from databases.event_writer import get_writer
 
 
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME"),
-        port=3306
-    )
 def insert_system_alert(
     alert_type,
     location,
@@ -21,9 +12,6 @@ def insert_system_alert(
     email_sent
 ):
 
-    conn = get_connection()
-    cur = conn.cursor()
-
     query = """
     INSERT INTO system_alerts
     (alert_id, alert_type, timestamp, location,
@@ -42,8 +30,4 @@ def insert_system_alert(
         False
     )
 
-    cur.execute(query, data)
-    conn.commit()
-
-    cur.close()
-    conn.close()
+    return get_writer().submit("system_alerts", query, data)
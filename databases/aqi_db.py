@@ -1,30 +1,8 @@
-import mysql.connector
-import streamlit as st
-from datetime import datetime
-import os
+from databases.db_connect import fetch_all
+from databases.event_writer import get_writer
 
-# -------------------------
-# CONNECTION 
-# -------------------------
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME"),
-        port=3306
-    )
-
-
-# -------------------------
-# INSERT AQI LOG
-# -------------------------
-def insert_aqi_log(data):
 
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    query = """
+AQI_LOG_INSERT = """
     INSERT INTO aqi_logs
     (
         timestamp,
@@ -44,7 +22,49 @@ def insert_aqi_log(data):
     VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
     """
 
-    cursor.execute(query, data)
 
-    conn.commit()
-    conn.close()
+# -------------------------
+# INSERT AQI LOG
+# -------------------------
+def insert_aqi_log(data):
+
+    return get_writer().submit("aqi_logs", AQI_LOG_INSERT, data)
+
+
+def insert_aqi_logs(rows):
+    """Bulk insert: every row in one executemany transaction, written now."""
+    return get_writer().write_now("aqi_logs", AQI_LOG_INSERT, rows)
+
+
+# -------------------------
+# LATEST READING PER STATION
+# -------------------------
+def latest_station_readings(city, since):
+    """
+    [(station, latitude, longitude, aqi, timestamp), ...] — each station's
+    newest located reading in city at or after `since`, one row per station
+    (ties on timestamp go to the later insert).
+    Readings without a station name are keyed by their coordinates rounded
+    to ~10 m, so each unnamed location counts once, with station None.
+    """
+    rows, _ = fetch_all(
+        """
+        SELECT monitoring_station, latitude, longitude, aqi, timestamp
+        FROM (
+            SELECT monitoring_station, latitude, longitude, aqi, timestamp,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY COALESCE(
+                           monitoring_station,
+                           CONCAT('@', ROUND(latitude, 4), ',', ROUND(longitude, 4))
+                       )
+                       ORDER BY timestamp DESC, id DESC
+                   ) AS rn
+            FROM aqi_logs
+            WHERE city = %s AND timestamp >= %s
+              AND latitude IS NOT NULL AND longitude IS NOT NULL
+        ) ranked
+        WHERE rn = 1
+        """,
+        (city, since)
+    )
+    return rows
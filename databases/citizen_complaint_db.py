@@ -1,23 +1,8 @@
-import mysql.connector
-import os
+from databases.db_connect import execute, fetch_all
 
-import mysql.connector
-import streamlit as st
-
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME"),
-        port=3306
-    )
 
 # ---------- Insert a new complaint ----------
 def insert_complaint(city,area, category, text, lat, lon, dept, priority):
-    conn = get_connection()
-    cursor = conn.cursor()
-
     query = """
     INSERT INTO citizen_complaints
     (city,area, category, complaint_text, latitude, longitude, department, priority)
@@ -25,16 +10,10 @@ def insert_complaint(city,area, category, text, lat, lon, dept, priority):
     """
 
     values = (city, area,category, text, lat, lon, dept, priority)
-    cursor.execute(query, values)
-
-    conn.commit()
-    conn.close()
+    execute(query, values)
 
 # ---------- Fetch latest complaints for live log ----------
 def fetch_complaints(limit=10):
-    conn = get_connection()
-    cursor = conn.cursor()
-
     query = """
         SELECT complaint_id, city, area,category, priority, complaint_text, timestamp
         FROM citizen_complaints
@@ -42,8 +21,5 @@ def fetch_complaints(limit=10):
         LIMIT %s
     """
 
-    cursor.execute(query, (limit,))
-    rows = cursor.fetchall()
-
-    conn.close()
+    rows, _ = fetch_all(query, (limit,))
     return rows
@@ -1,19 +1,4 @@
-import mysql.connector
-from datetime import datetime
-import streamlit as st
-import os
-
-# -------------------------
-# DB CONFIG — change to yours
-# -------------------------
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME"),
-        port=3306
-    )
+from databases.event_writer import get_writer
 
 
 # -------------------------
@@ -21,9 +6,6 @@ def get_connection():
 # -------------------------
 def insert_crowd_log(data):
 
-    conn = get_connection()
-    cursor = conn.cursor()
-
     query = """
     INSERT INTO crowd_density_logs
     (timestamp,
@@ -37,7 +19,4 @@ def insert_crowd_log(data):
     VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
     """
 
-    cursor.execute(query, data)
-    conn.commit()
-    conn.close()
-
+    return get_writer().submit("crowd_density_logs", query, data)
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from databases.db_connect import get_connection
+
+
+# ---------- cache config (env) ----------
+# history kept in memory per table
+WINDOW_DAYS = int(os.getenv("DASHBOARD_WINDOW_DAYS", "90"))
+# rows are re-read this far behind the high-water mark, so rows that
+# reach the table late (event writer buffering) are still picked up
+OVERLAP_SECS = int(os.getenv("DASHBOARD_OVERLAP_SECS", "120"))
+# sessions refreshing within this interval share the last fetch
+MIN_REFRESH_SECS = float(os.getenv("DASHBOARD_MIN_REFRESH_SECS", "15"))
+
+
+class TableCache:
+    """In-memory copy of one log table, refreshed incrementally by timestamp."""
+
+    def __init__(self, table, window_days=WINDOW_DAYS,
+                 overlap_secs=OVERLAP_SECS, min_refresh_secs=MIN_REFRESH_SECS):
+        self.table = table
+        self.window = timedelta(days=window_days)
+        self.overlap = timedelta(seconds=overlap_secs)
+        self.min_refresh_secs = min_refresh_secs
+
+        self.df = None
+        self.last_refresh = 0.0
+        self.last_fetched_rows = 0
+        self._lock = threading.Lock()
+
+    def _fetch(self, since):
+        conn = get_connection()
+        try:
+            df = pd.read_sql(
+                f"SELECT * FROM {self.table} WHERE timestamp >= %s ORDER BY timestamp",
+                conn,
+                params=(since,)
+            )
+        finally:
+            conn.close()
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        return df
+
+    def get(self):
+        with self._lock:
+            if (self.df is not None
+                    and time.monotonic() - self.last_refresh < self.min_refresh_secs):
+                return self.df
+
+            cutoff = datetime.now() - self.window
+
+            if self.df is None or self.df.empty:
+                fresh = self._fetch(cutoff)
+                df = fresh
+            else:
+                # everything from (high-water mark - overlap) is replaced
+                # by the fresh read; older rows are kept as they are
+                since = max(self.df["timestamp"].max() - self.overlap, cutoff)
+                fresh = self._fetch(since)
+                kept = self.df[
+                    (self.df["timestamp"] >= cutoff) & (self.df["timestamp"] < since)
+                ]
+                df = pd.concat([kept, fresh], ignore_index=True)
+
+            self.df = df
+            self.last_fetched_rows = len(fresh)
+            self.last_refresh = time.monotonic()
+            return self.df
+
+
+# ---------- shared across every session of this process ----------
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def load_table(name):
+    """Rows of a log table from the last WINDOW_DAYS, cached per process."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = TableCache(name)
+    return cache.get()
+
+
+def cache_stats():
+    """Cached rows and rows fetched on the last refresh, per table."""
+    return {
+        name: {
+            "rows": 0 if c.df is None else len(c.df),
+            "last_fetched_rows": c.last_fetched_rows,
+        }
+        for name, c in _caches.items()
+    }
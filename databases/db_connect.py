@@ -1,11 +1,156 @@
 import os
-import mysql.connector
+import threading
+import time
+from contextlib import contextmanager
 
-def get_connection():
-    return mysql.connector.connect(
+from mysql.connector import errors, pooling
+
+
+# ---------- pool config (env) ----------
+# mysql-connector refuses pools larger than CNX_POOL_MAXSIZE
+POOL_NAME = "urbanbot"
+POOL_SIZE = min(int(os.getenv("DB_POOL_SIZE", "8")), pooling.CNX_POOL_MAXSIZE)
+POOL_WAIT_SECS = float(os.getenv("DB_POOL_WAIT_SECS", "10"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "checkouts": 0,
+    "waits": 0,
+    "wait_secs_total": 0.0,
+    "wait_secs_max": 0.0,
+    "timeouts": 0,
+    "reconnects": 0,
+}
+
+
+def _db_config():
+    return dict(
         host=os.getenv("DB_HOST"),
         user=os.getenv("DB_USER"),
         password=os.getenv("DB_PASS"),
         database=os.getenv("DB_NAME"),
         port=3306
     )
+
+
+def get_pool():
+    """Process-wide MySQL connection pool, created on first use."""
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=POOL_NAME,
+                    pool_size=POOL_SIZE,
+                    pool_reset_session=True,
+                    **_db_config()
+                )
+    return _pool
+
+
+def _record_checkout(waited, had_to_wait):
+    with _metrics_lock:
+        _metrics["checkouts"] += 1
+        if had_to_wait:
+            _metrics["waits"] += 1
+            _metrics["wait_secs_total"] += waited
+            _metrics["wait_secs_max"] = max(_metrics["wait_secs_max"], waited)
+
+
+def get_connection():
+    """
+    Borrow a connection from the pool.
+    Calling close() on it returns it to the pool instead of
+    tearing down the TCP session.
+    """
+    pool = get_pool()
+    start = time.perf_counter()
+    had_to_wait = False
+
+    # the connector raises PoolError instead of blocking when every
+    # connection is checked out, so wait here up to DB_POOL_WAIT_SECS
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except errors.PoolError:
+            had_to_wait = True
+            if time.perf_counter() - start >= POOL_WAIT_SECS:
+                with _metrics_lock:
+                    _metrics["timeouts"] += 1
+                raise
+            time.sleep(0.02)
+
+    _record_checkout(time.perf_counter() - start, had_to_wait)
+
+    # pre-ping: pooled sessions may have been dropped by the server
+    # (wait_timeout, RDS failover) while idle
+    try:
+        conn.ping(reconnect=False)
+    except errors.Error:
+        conn.reconnect(attempts=2, delay=0.2)
+        with _metrics_lock:
+            _metrics["reconnects"] += 1
+
+    return conn
+
+
+@contextmanager
+def db_cursor(commit=False):
+    """Pooled cursor; commits on success when commit=True."""
+    conn = get_connection()
+    cur = None
+    try:
+        # inside the try, so a failing cursor() still returns the connection
+        cur = conn.cursor()
+        yield cur
+        if commit:
+            conn.commit()
+    except Exception:
+        if commit:
+            conn.rollback()
+        raise
+    finally:
+        if cur is not None:
+            cur.close()
+        conn.close()
+
+
+def execute(query, params=None):
+    """Run one write statement and commit it."""
+    with db_cursor(commit=True) as cur:
+        cur.execute(query, params or ())
+
+
+def fetch_all(query, params=None):
+    """Run a read query and return (rows, column names)."""
+    with db_cursor() as cur:
+        cur.execute(query, params or ())
+        rows = cur.fetchall()
+        cols = [c[0] for c in cur.description] if cur.description else []
+    return rows, cols
+
+
+def pool_health():
+    """SELECT 1 through the pool; returns (ok, round-trip secs or error)."""
+    start = time.perf_counter()
+    try:
+        fetch_all("SELECT 1")
+    except Exception as e:
+        return False, str(e)
+    return True, round(time.perf_counter() - start, 4)
+
+
+def pool_metrics():
+    """Checkout / wait-time counters for the shared pool."""
+    with _metrics_lock:
+        m = dict(_metrics)
+    m["pool_size"] = POOL_SIZE
+    m["wait_secs_avg"] = (
+        round(m["wait_secs_total"] / m["waits"], 4) if m["waits"] else 0.0
+    )
+    return m
@@ -0,0 +1,250 @@
+import atexit
+import os
+import threading
+import time
+
+from databases.db_connect import db_cursor
+from databases.rollups import update_on_insert
+
+
+# ---------- writer config (env) ----------
+BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", "200"))
+FLUSH_SECS = float(os.getenv("DB_WRITE_FLUSH_SECS", "2"))
+MAX_PENDING = int(os.getenv("DB_WRITE_MAX_PENDING", "10000"))
+BLOCK_SECS = float(os.getenv("DB_WRITE_BLOCK_SECS", "5"))
+RETRIES = int(os.getenv("DB_WRITE_RETRIES", "3"))
+# pages warn about dropped rows for this long after a failure
+FAILURE_NOTICE_SECS = float(os.getenv("DB_WRITE_FAILURE_NOTICE_SECS", "600"))
+
+
+class EventWriter:
+    """
+    Write-behind buffer for log inserts.
+    Rows are grouped per table and written with executemany in one
+    transaction once a table has BATCH_SIZE rows or its oldest row is
+    FLUSH_SECS old. Callers block (backpressure) while MAX_PENDING rows
+    are waiting; after BLOCK_SECS they write their own rows directly.
+    A failed background batch is requeued up to RETRIES times, FLUSH_SECS apart.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_secs=FLUSH_SECS,
+                 max_pending=MAX_PENDING, block_secs=BLOCK_SECS, retries=RETRIES):
+        self.batch_size = batch_size
+        self.flush_secs = flush_secs
+        self.max_pending = max_pending
+        self.block_secs = block_secs
+        self.retries = retries
+
+        # table → {"query": str, "rows": [...], "since": monotonic,
+        #          "attempts": failed writes so far, "retry_at": monotonic}
+        self._buffers = {}
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        # {"table", "rows", "error", "at": epoch secs} of the last dropped batch
+        self._last_failure = None
+
+        self._counters = {
+            "queued": 0,
+            "flushed": 0,
+            "failed": 0,
+            "batches": 0,
+            "blocked": 0,
+            "direct": 0,
+            "retried": 0,
+        }
+
+        self._thread = threading.Thread(
+            target=self._run, name="event-writer", daemon=True
+        )
+        self._thread.start()
+
+    # ---------- producer side ----------
+    def submit(self, table, query, row):
+        return self.submit_many(table, query, [row])
+
+    def submit_many(self, table, query, rows):
+        """Buffer rows → True, or False if they had to be written directly and failed."""
+        rows = list(rows)
+        if not rows:
+            return True
+
+        with self._cond:
+            # a batch bigger than the whole buffer can never fit: don't wait for room
+            fits = len(rows) <= self.max_pending
+            if fits and self._pending + len(rows) > self.max_pending:
+                self._counters["blocked"] += 1
+                deadline = time.monotonic() + self.block_secs
+                while (self._pending + len(rows) > self.max_pending
+                       and not self._closed):
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._cond.wait(left)
+
+            direct = not fits or self._closed or self._pending + len(rows) > self.max_pending
+            if not direct:
+                self._enqueue(table, query, rows)
+                self._counters["queued"] += len(rows)
+                return True
+
+            self._counters["direct"] += len(rows)
+
+        # too big, queue still full or shut down: the caller pays for the write
+        return self._write(table, query, rows)
+
+    def write_now(self, table, query, rows):
+        """
+        Bulk insert: the table's buffered rows plus these, in one
+        executemany transaction in this thread → True if it committed.
+        """
+        rows = list(rows)
+        with self._cond:
+            batch = self._take(table)
+        if batch:
+            rows = batch[1] + rows
+        if not rows:
+            return True
+        return self._write(table, query, rows)
+
+    def _enqueue(self, table, query, rows, attempts=0):
+        """Add rows to a table's buffer; caller holds the lock."""
+        buf = self._buffers.setdefault(
+            table, {"query": query, "rows": [], "since": time.monotonic(),
+                    "attempts": 0, "retry_at": 0.0}
+        )
+        if attempts:
+            # retried rows go first and hold the buffer back for a flush period
+            buf["rows"][:0] = rows
+            buf["attempts"] = max(buf["attempts"], attempts)
+            buf["retry_at"] = time.monotonic() + self.flush_secs
+        else:
+            buf["rows"].extend(rows)
+        self._pending += len(rows)
+
+        if len(buf["rows"]) >= self.batch_size:
+            self._cond.notify_all()
+
+    # ---------- consumer side ----------
+    def _take(self, table):
+        """Pop a table's buffered rows; caller holds the lock."""
+        buf = self._buffers.pop(table, None)
+        if not buf:
+            return None
+        self._pending -= len(buf["rows"])
+        self._cond.notify_all()
+        return buf["query"], buf["rows"], buf["attempts"]
+
+    def _due(self, now):
+        return [
+            t for t, buf in self._buffers.items()
+            if now >= buf["retry_at"]
+            and (len(buf["rows"]) >= self.batch_size or now - buf["since"] >= self.flush_secs)
+        ]
+
+    def _write(self, table, query, rows, attempts=None):
+        """
+        One executemany transaction → True if it committed.
+        attempts → failed writes so far for a background batch, which is
+        requeued on failure until RETRIES; None for callers that get the result.
+        """
+        try:
+            with db_cursor(commit=True) as cur:
+                cur.executemany(query, rows)
+                # hourly/daily summaries commit together with the rows
+                update_on_insert(cur, table, rows)
+        except Exception as e:
+            with self._cond:
+                if attempts is not None and attempts < self.retries and not self._closed:
+                    self._counters["retried"] += len(rows)
+                    self._enqueue(table, query, rows, attempts + 1)
+                    print(f"Event writer: {len(rows)} rows for {table} failed, retry {attempts + 1}/{self.retries}: {e}")
+                    return False
+                self._counters["failed"] += len(rows)
+                self._last_failure = {
+                    "table": table, "rows": len(rows), "error": str(e), "at": time.time()
+                }
+            print(f"Event writer: {len(rows)} rows for {table} failed: {e}")
+            return False
+
+        with self._cond:
+            self._counters["flushed"] += len(rows)
+            self._counters["batches"] += 1
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not self._due(time.monotonic()):
+                    self._cond.wait(self.flush_secs / 4)
+                if self._closed:
+                    return
+                batches = [(t, self._take(t)) for t in self._due(time.monotonic())]
+
+            for table, (query, rows, attempts) in batches:
+                self._write(table, query, rows, attempts)
+
+    def flush(self, table=None):
+        """Write buffered rows now (all tables, or one) in this thread."""
+        with self._cond:
+            tables = [table] if table else list(self._buffers)
+            batches = [(t, self._take(t)) for t in tables]
+
+        ok = True
+        for t, batch in batches:
+            if batch:
+                query, rows, _ = batch
+                ok = self._write(t, query, rows) and ok
+        return ok
+
+    def close(self):
+        """Stop the background thread and write everything still buffered."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=self.flush_secs + 1)
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            s = dict(self._counters)
+            s["pending"] = self._pending
+            s["last_failure"] = dict(self._last_failure) if self._last_failure else None
+        return s
+
+
+# ---------- process-wide writer ----------
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = EventWriter()
+                # Streamlit turns SIGTERM / Ctrl+C into a clean exit, so this runs
+                atexit.register(_writer.close)
+    return _writer
+
+
+def writer_stats():
+    """queued / flushed / failed row counters (empty until first write)."""
+    return _writer.stats() if _writer is not None else {}
+
+
+def write_failure_notice(within_secs=FAILURE_NOTICE_SECS):
+    """
+    Text for pages when buffered rows were dropped recently, else None.
+    Queued inserts fail after the page has moved on, so this is how they surface.
+    """
+    failure = writer_stats().get("last_failure")
+    if not failure or time.time() - failure["at"] > within_secs:
+        return None
+    ago = int(time.time() - failure["at"])
+    return (
+        f"⚠️ Database write failed {ago}s ago: {failure['rows']} {failure['table']} rows "
+        f"dropped ({writer_stats()['failed']} in total) — {failure['error']}"
+    )
@@ -0,0 +1,132 @@
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from databases.db_connect import db_cursor
+from databases.rollups import ROLLUP_TABLES
+
+
+# ---------- canonical read queries ----------
+# one entry per read path in the app; keep in sync when a query changes
+def canonical_queries():
+    now = datetime.now()
+    day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week = day - timedelta(days=7)
+    daily = ROLLUP_TABLES["daily"]
+
+    queries = [
+        ("fetch_complaints", """
+            SELECT complaint_id, city, area, category, priority, complaint_text, timestamp
+            FROM citizen_complaints ORDER BY timestamp DESC LIMIT %s
+        """, (10,)),
+        ("complaint_summary", """
+            SELECT category, COUNT(*) FROM citizen_complaints GROUP BY category
+        """, ()),
+        ("alerts_summary", """
+            SELECT alert_type, COUNT(*) FROM system_alerts GROUP BY alert_type
+        """, ()),
+        ("rollup level_totals", f"""
+            SELECT level, SUM(event_count) FROM {daily}
+            WHERE source = %s GROUP BY level
+        """, ("traffic_logs",)),
+        ("rollup daily_counts", f"""
+            SELECT DATE(bucket) AS day, SUM(event_count) FROM {daily}
+            WHERE source = %s AND bucket >= %s AND bucket < %s GROUP BY day
+        """, ("accident_logs", week, day + timedelta(days=1))),
+        ("complaints daily_counts", """
+            SELECT DATE(timestamp) AS day, COUNT(*) FROM citizen_complaints
+            WHERE timestamp >= %s AND timestamp < %s GROUP BY day
+        """, (week, day + timedelta(days=1))),
+        ("alerts today", """
+            SELECT COUNT(*) FROM system_alerts
+            WHERE timestamp >= %s AND timestamp < %s
+        """, (day, day + timedelta(days=1))),
+        ("llm rule: today by city", """
+            SELECT city, COUNT(*) FROM accident_logs
+            WHERE timestamp >= CURDATE() AND timestamp < CURDATE() + INTERVAL 1 DAY
+            GROUP BY city
+        """, ()),
+        ("llm rule: last week by level", """
+            SELECT congestion_level, COUNT(*) FROM traffic_logs
+            WHERE timestamp >= CURDATE() - INTERVAL 7 DAY
+            GROUP BY congestion_level
+        """, ()),
+        ("aqi city history", """
+            SELECT DATE(timestamp) AS day, AVG(aqi) FROM aqi_logs
+            WHERE city = %s AND timestamp >= %s GROUP BY day
+        """, ("Chennai", week)),
+    ]
+
+    # incremental dashboard refresh, for every log table
+    for table in [
+        "traffic_logs", "accident_logs", "crowd_density_logs", "citizen_complaints",
+        "system_alerts", "aqi_logs", "road_damage_logs",
+    ]:
+        queries.append((
+            f"dashboard refresh {table}",
+            f"SELECT * FROM {table} WHERE timestamp >= %s ORDER BY timestamp",
+            (now - timedelta(minutes=5),)
+        ))
+
+    return queries
+
+
+# EXPLAIN access types that read every row of a table or of an index
+FULL_SCAN_TYPES = {"ALL", "index"}
+
+
+def explain(query, params):
+    """EXPLAIN rows as dicts (table, type, key, rows, ...)."""
+    with db_cursor() as cur:
+        cur.execute("EXPLAIN " + query, params)
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+def check(ignore_below=1000):
+    """
+    EXPLAIN every canonical query.
+    Returns the list of full scans: whole tables (type=ALL) and whole
+    indexes (type=index). Scans estimated below ignore_below rows are
+    printed but not counted (MySQL prefers a scan there even when an
+    index exists).
+    """
+    failures = []
+
+    for name, query, params in canonical_queries():
+        for row in explain(query, params):
+            if row.get("table") is None:
+                continue
+
+            access = row.get("type")
+            est = int(row.get("rows") or 0)
+            line = f"{name:36} {row['table']:22} type={access} key={row.get('key')} rows≈{est}"
+
+            if access in FULL_SCAN_TYPES and est >= ignore_below:
+                print("FULL SCAN  " + line)
+                failures.append((name, row["table"]))
+            elif access in FULL_SCAN_TYPES:
+                print("small scan " + line)
+            else:
+                print("ok         " + line)
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a canonical query does a full table or index scan")
+    parser.add_argument(
+        "--ignore-below", type=int, default=1000,
+        help="tolerate full scans on tables with fewer estimated rows"
+    )
+    args = parser.parse_args()
+
+    failures = check(args.ignore_below)
+    if failures:
+        print(f"\n{len(failures)} full scan(s) — add an index or rewrite the query")
+        sys.exit(1)
+    print("\nNo full scans")
+
+
+if __name__ == "__main__":
+    main()
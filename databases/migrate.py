@@ -0,0 +1,111 @@
+import argparse
+import os
+import re
+
+from databases.db_connect import db_cursor, fetch_all
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+VERSION_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version     VARCHAR(16)  NOT NULL,
+    name        VARCHAR(128) NOT NULL,
+    applied_at  DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (version)
+)
+"""
+
+
+def list_migrations():
+    """[(version, name, path)] for every NNNN_name.sql file, in order."""
+    found = []
+    for fname in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not fname.endswith(".sql"):
+            continue
+        version, _, name = fname[:-4].partition("_")
+        found.append((version, name, os.path.join(MIGRATIONS_DIR, fname)))
+    return found
+
+
+def split_statements(text):
+    """Split a migration file on ';', dropping '--' comment lines."""
+    lines = [l for l in text.splitlines() if not l.strip().startswith("--")]
+    return [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+
+# MySQL has no CREATE INDEX IF NOT EXISTS
+CREATE_INDEX_RE = re.compile(r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)", re.IGNORECASE)
+
+
+def _already_applied(cur, stmt):
+    """True for a CREATE INDEX whose index already exists (re-run after a partial failure)."""
+    m = CREATE_INDEX_RE.match(stmt)
+    if not m:
+        return False
+    cur.execute(
+        """
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+        """,
+        (m.group(2), m.group(1))
+    )
+    return bool(cur.fetchall())
+
+
+def applied_versions():
+    with db_cursor(commit=True) as cur:
+        cur.execute(VERSION_TABLE_DDL)
+    rows, _ = fetch_all("SELECT version FROM schema_migrations")
+    return {r[0] for r in rows}
+
+
+def migrate(dry_run=False):
+    """Apply every migration not yet recorded in schema_migrations."""
+    done = applied_versions()
+    applied = []
+
+    for version, name, path in list_migrations():
+        if version in done:
+            continue
+
+        with open(path) as f:
+            statements = split_statements(f.read())
+
+        if dry_run:
+            print(f"pending {version} {name} ({len(statements)} statements)")
+            continue
+
+        # MySQL commits DDL implicitly, so a failure part-way leaves the
+        # version unrecorded; on the re-run, indexes that were already
+        # created are skipped and CREATE TABLE statements use IF NOT EXISTS
+        with db_cursor(commit=True) as cur:
+            for stmt in statements:
+                if _already_applied(cur, stmt):
+                    print(f"  skip (exists): {stmt.splitlines()[0]}")
+                    continue
+                cur.execute(stmt)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name)
+            )
+
+        print(f"applied {version} {name}")
+        applied.append(version)
+
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations")
+    parser.add_argument("--dry-run", action="store_true", help="only list pending migrations")
+    args = parser.parse_args()
+
+    applied = migrate(dry_run=args.dry_run)
+    if not args.dry_run and not applied:
+        print("Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+-- Log tables used by databases/*_db.py.
+-- IF NOT EXISTS keeps this a no-op on deployments created before migrations.
+
+CREATE TABLE IF NOT EXISTS traffic_logs (
+    id                BIGINT       NOT NULL AUTO_INCREMENT,
+    timestamp         DATETIME     NOT NULL,
+    city              VARCHAR(64)  NOT NULL,
+    area              VARCHAR(128) NOT NULL,
+    latitude          DOUBLE,
+    longitude         DOUBLE,
+    vehicle_count     INT          NOT NULL,
+    congestion_level  VARCHAR(16)  NOT NULL,
+    is_peak_hour      BOOLEAN,
+    image_url         VARCHAR(512),
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS accident_logs (
+    accident_id           VARCHAR(36)  NOT NULL,
+    timestamp             DATETIME     NOT NULL,
+    image_url             VARCHAR(512),
+    city                  VARCHAR(64)  NOT NULL,
+    area                  VARCHAR(128),
+    latitude              DOUBLE,
+    longitude             DOUBLE,
+    severity              VARCHAR(16)  NOT NULL,
+    emergency_alert_sent  BOOLEAN,
+    PRIMARY KEY (accident_id)
+);
+
+CREATE TABLE IF NOT EXISTS crowd_density_logs (
+    id               BIGINT       NOT NULL AUTO_INCREMENT,
+    timestamp        DATETIME     NOT NULL,
+    city             VARCHAR(64)  NOT NULL,
+    area             VARCHAR(128) NOT NULL,
+    latitude         DOUBLE,
+    longitude        DOUBLE,
+    predicted_count  INT          NOT NULL,
+    density_level    VARCHAR(16)  NOT NULL,
+    image_url        VARCHAR(512),
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS aqi_logs (
+    id                  BIGINT       NOT NULL AUTO_INCREMENT,
+    timestamp           DATETIME     NOT NULL,
+    city                VARCHAR(64)  NOT NULL,
+    monitoring_station  VARCHAR(128),
+    latitude            DOUBLE,
+    longitude           DOUBLE,
+    pm25                DOUBLE,
+    pm10                DOUBLE,
+    co                  DOUBLE,
+    no2                 DOUBLE,
+    so2                 DOUBLE,
+    o3                  DOUBLE,
+    aqi                 INT          NOT NULL,
+    aqi_category        VARCHAR(16)  NOT NULL,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS road_damage_logs (
+    image_id       VARCHAR(36)  NOT NULL,
+    image_url      VARCHAR(512),
+    timestamp      DATETIME     NOT NULL,
+    city           VARCHAR(64)  NOT NULL,
+    area           VARCHAR(128),
+    latitude       DOUBLE,
+    longitude      DOUBLE,
+    camera_source  VARCHAR(32),
+    weather        VARCHAR(16),
+    road_type      VARCHAR(16),
+    resolution     VARCHAR(16),
+    annotated      BOOLEAN,
+    PRIMARY KEY (image_id)
+);
+
+CREATE TABLE IF NOT EXISTS citizen_complaints (
+    complaint_id    BIGINT       NOT NULL AUTO_INCREMENT,
+    city            VARCHAR(64)  NOT NULL,
+    area            VARCHAR(128),
+    category        VARCHAR(32)  NOT NULL,
+    complaint_text  TEXT         NOT NULL,
+    latitude        DOUBLE,
+    longitude       DOUBLE,
+    department      VARCHAR(64),
+    priority        VARCHAR(16),
+    timestamp       DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (complaint_id)
+);
+
+CREATE TABLE IF NOT EXISTS system_alerts (
+    alert_id    VARCHAR(36)  NOT NULL,
+    alert_type  VARCHAR(32)  NOT NULL,
+    timestamp   DATETIME     NOT NULL,
+    location    VARCHAR(128),
+    severity    VARCHAR(16),
+    message     TEXT,
+    email_sent  BOOLEAN,
+    resolved    BOOLEAN      NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (alert_id)
+);
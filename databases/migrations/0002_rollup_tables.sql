@@ -0,0 +1,29 @@
+-- Hourly / daily summaries maintained by databases/rollups.py.
+
+CREATE TABLE IF NOT EXISTS log_rollup_hourly (
+    source       VARCHAR(32)  NOT NULL,
+    bucket       DATETIME     NOT NULL,
+    city         VARCHAR(64)  NOT NULL,
+    area         VARCHAR(128) NOT NULL,
+    level        VARCHAR(32)  NOT NULL,
+    event_count  INT          NOT NULL,
+    value_count  INT          NOT NULL,
+    value_sum    DOUBLE       NULL,
+    value_min    DOUBLE       NULL,
+    value_max    DOUBLE       NULL,
+    PRIMARY KEY (source, bucket, city, area, level)
+);
+
+CREATE TABLE IF NOT EXISTS log_rollup_daily (
+    source       VARCHAR(32)  NOT NULL,
+    bucket       DATETIME     NOT NULL,
+    city         VARCHAR(64)  NOT NULL,
+    area         VARCHAR(128) NOT NULL,
+    level        VARCHAR(32)  NOT NULL,
+    event_count  INT          NOT NULL,
+    value_count  INT          NOT NULL,
+    value_sum    DOUBLE       NULL,
+    value_min    DOUBLE       NULL,
+    value_max    DOUBLE       NULL,
+    PRIMARY KEY (source, bucket, city, area, level)
+);
@@ -0,0 +1,33 @@
+-- Composite indexes for the read paths:
+--   * timestamp ranges / ORDER BY timestamp (dashboard cache, aggregates,
+--     fetch_complaints, chatbot date rules)
+--   * GROUP BY / filter on a level column, optionally within a time range
+--   * per-city history (AQI forecast updates, chatbot "by city" questions)
+
+CREATE INDEX idx_traffic_ts ON traffic_logs (timestamp);
+CREATE INDEX idx_traffic_level_ts ON traffic_logs (congestion_level, timestamp);
+CREATE INDEX idx_traffic_city_ts ON traffic_logs (city, timestamp);
+
+CREATE INDEX idx_accident_ts ON accident_logs (timestamp);
+CREATE INDEX idx_accident_severity_ts ON accident_logs (severity, timestamp);
+CREATE INDEX idx_accident_city_ts ON accident_logs (city, timestamp);
+
+CREATE INDEX idx_crowd_ts ON crowd_density_logs (timestamp);
+CREATE INDEX idx_crowd_level_ts ON crowd_density_logs (density_level, timestamp);
+CREATE INDEX idx_crowd_city_ts ON crowd_density_logs (city, timestamp);
+
+CREATE INDEX idx_aqi_ts ON aqi_logs (timestamp);
+CREATE INDEX idx_aqi_category_ts ON aqi_logs (aqi_category, timestamp);
+CREATE INDEX idx_aqi_city_ts ON aqi_logs (city, timestamp, aqi);
+
+CREATE INDEX idx_road_damage_ts ON road_damage_logs (timestamp);
+CREATE INDEX idx_road_damage_city_ts ON road_damage_logs (city, timestamp);
+
+CREATE INDEX idx_complaints_ts ON citizen_complaints (timestamp);
+CREATE INDEX idx_complaints_category_ts ON citizen_complaints (category, timestamp);
+CREATE INDEX idx_complaints_city_ts ON citizen_complaints (city, timestamp);
+
+CREATE INDEX idx_alerts_ts ON system_alerts (timestamp);
+CREATE INDEX idx_alerts_type_ts ON system_alerts (alert_type, timestamp);
+
+CREATE INDEX idx_rollup_daily_source_level ON log_rollup_daily (source, level);
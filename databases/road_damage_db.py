@@ -1,20 +1,7 @@
-import mysql.connector
-import streamlit as st
-import os
+from databases.event_writer import get_writer
 
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME"),
-        port=3306
-    )
 
 def insert_road_damage(data):
-    conn = get_connection()
-    cursor = conn.cursor()
-
     query = """
     INSERT INTO road_damage_logs
     (image_id, image_url, timestamp, city,area, latitude, longitude,
@@ -22,6 +9,4 @@ def insert_road_damage(data):
     VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
     """
 
-    cursor.execute(query, data)
-    conn.commit()
-    conn.close()
+    return get_writer().submit("road_damage_logs", query, data)
@@ -0,0 +1,202 @@
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+from databases.db_connect import db_cursor
+from databases.migrate import migrate
+
+
+# ---------- config (env) ----------
+# "insert" → rollups are updated in the same transaction as each batch of
+#            log rows; "compactor" → only `python -m databases.rollups compact`
+ROLLUP_MODE = os.getenv("ROLLUP_MODE", "insert")
+
+ROLLUP_TABLES = {
+    "hourly": "log_rollup_hourly",
+    "daily": "log_rollup_daily",
+}
+
+# log table → column names, and positions of the same fields in the
+# tuples built by the matching insert_* helper
+ROLLUP_SOURCES = {
+    "traffic_logs": {
+        "columns": {"city": "city", "area": "area", "level": "congestion_level", "value": "vehicle_count"},
+        "row": {"timestamp": 0, "city": 1, "area": 2, "level": 6, "value": 5},
+    },
+    "accident_logs": {
+        "columns": {"city": "city", "area": "area", "level": "severity", "value": None},
+        "row": {"timestamp": 1, "city": 3, "area": 4, "level": 7, "value": None},
+    },
+    "aqi_logs": {
+        "columns": {"city": "city", "area": "monitoring_station", "level": "aqi_category", "value": "aqi"},
+        "row": {"timestamp": 0, "city": 1, "area": 2, "level": 12, "value": 11},
+    },
+    "crowd_density_logs": {
+        "columns": {"city": "city", "area": "area", "level": "density_level", "value": "predicted_count"},
+        "row": {"timestamp": 0, "city": 1, "area": 2, "level": 6, "value": 5},
+    },
+}
+
+
+# ---------- schema ----------
+def create_tables():
+    """Rollup tables live in migrations/0002_rollup_tables.sql."""
+    migrate()
+
+
+# ---------- on-insert maintenance ----------
+UPSERT_SQL = """
+INSERT INTO {table}
+(source, bucket, city, area, level,
+ event_count, value_count, value_sum, value_min, value_max)
+VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+ON DUPLICATE KEY UPDATE
+    event_count = event_count + VALUES(event_count),
+    value_count = value_count + VALUES(value_count),
+    value_sum = IF(VALUES(value_sum) IS NULL, value_sum,
+                   COALESCE(value_sum, 0) + VALUES(value_sum)),
+    value_min = LEAST(COALESCE(value_min, VALUES(value_min)),
+                      COALESCE(VALUES(value_min), value_min)),
+    value_max = GREATEST(COALESCE(value_max, VALUES(value_max)),
+                         COALESCE(VALUES(value_max), value_max))
+"""
+
+
+def _bucket(ts, grain):
+    if grain == "hourly":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def summarize_rows(source, rows, grain):
+    """Collapse insert tuples into one upsert row per bucket/city/area/level."""
+    pos = ROLLUP_SOURCES[source]["row"]
+    groups = {}
+
+    for r in rows:
+        key = (
+            source,
+            _bucket(r[pos["timestamp"]], grain),
+            r[pos["city"]] or "",
+            r[pos["area"]] or "",
+            r[pos["level"]] or "",
+        )
+        value = r[pos["value"]] if pos["value"] is not None else None
+
+        g = groups.setdefault(key, [0, 0, None, None, None])
+        g[0] += 1
+        if value is not None:
+            value = float(value)
+            g[1] += 1
+            g[2] = value if g[2] is None else g[2] + value
+            g[3] = value if g[3] is None else min(g[3], value)
+            g[4] = value if g[4] is None else max(g[4], value)
+
+    return [key + tuple(g) for key, g in groups.items()]
+
+
+def update_on_insert(cur, table, rows):
+    """
+    Fold freshly inserted log rows into the hourly and daily rollups.
+    Called by the event writer inside the insert transaction.
+    """
+    if ROLLUP_MODE != "insert" or table not in ROLLUP_SOURCES:
+        return
+
+    for grain, rollup_table in ROLLUP_TABLES.items():
+        cur.executemany(
+            UPSERT_SQL.format(table=rollup_table),
+            summarize_rows(table, rows, grain)
+        )
+
+
+# ---------- compactor / backfill ----------
+BUCKET_SQL = {
+    "hourly": "TIMESTAMP(DATE(timestamp), MAKETIME(HOUR(timestamp), 0, 0))",
+    "daily": "TIMESTAMP(DATE(timestamp))",
+}
+
+
+def compact(since=None, sources=None):
+    """
+    Rebuild rollup buckets from the raw logs.
+    since → datetime; buckets from its hour/day onwards are rebuilt
+            (None rebuilds everything, i.e. a backfill)
+    """
+    sources = sources or list(ROLLUP_SOURCES)
+    rebuilt = {}
+
+    for source in sources:
+        cols = ROLLUP_SOURCES[source]["columns"]
+        value = cols["value"] or "NULL"
+
+        for grain, rollup_table in ROLLUP_TABLES.items():
+            start = _bucket(since, grain) if since else None
+            where = "WHERE timestamp >= %s" if start else ""
+            params = (start,) if start else ()
+
+            with db_cursor(commit=True) as cur:
+                cur.execute(
+                    f"DELETE FROM {rollup_table} WHERE source = %s"
+                    + (" AND bucket >= %s" if start else ""),
+                    (source,) + params
+                )
+                cur.execute(
+                    f"""
+                    INSERT INTO {rollup_table}
+                    (source, bucket, city, area, level,
+                     event_count, value_count, value_sum, value_min, value_max)
+                    SELECT
+                        %s,
+                        {BUCKET_SQL[grain]} AS b,
+                        COALESCE({cols['city']}, '') AS c,
+                        COALESCE({cols['area']}, '') AS a,
+                        COALESCE({cols['level']}, '') AS l,
+                        COUNT(*), COUNT({value}), SUM({value}), MIN({value}), MAX({value})
+                    FROM {source}
+                    {where}
+                    GROUP BY b, c, a, l
+                    """,
+                    (source,) + params
+                )
+                rebuilt[(source, grain)] = cur.rowcount
+
+    return rebuilt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain log rollup tables")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("create", help="create the rollup tables")
+    sub.add_parser("backfill", help="rebuild every bucket from the raw logs")
+
+    p = sub.add_parser("compact", help="rebuild recent buckets")
+    p.add_argument("--hours", type=int, default=2, help="how far back to rebuild")
+    p.add_argument("--loop", type=float, default=0, help="repeat every N seconds")
+
+    args = parser.parse_args()
+
+    if args.cmd == "create":
+        create_tables()
+        print("Rollup tables ready")
+
+    elif args.cmd == "backfill":
+        create_tables()
+        start = time.perf_counter()
+        for (source, grain), n in compact().items():
+            print(f"{source} {grain}: {n} buckets")
+        print(f"Backfill done in {time.perf_counter() - start:.1f}s")
+
+    else:
+        while True:
+            compact(since=datetime.now() - timedelta(hours=args.hours))
+            print(f"Compacted last {args.hours}h at {datetime.now():%H:%M:%S}")
+            if not args.loop:
+                break
+            time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,7 @@
-import mysql.connector
-import streamlit as st
-from datetime import datetime
-import os
+from databases.event_writer import get_writer
 
 
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME"),
-        port=3306
-    )
-
-
-def insert_traffic_log(data):
-
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    query = """
+TRAFFIC_LOG_INSERT = """
     INSERT INTO traffic_logs
     (timestamp,
      city,
@@ -33,6 +15,12 @@ def insert_traffic_log(data):
     VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
     """
 
-    cursor.execute(query, data)
-    conn.commit()
-    conn.close()
+
+def insert_traffic_log(data):
+
+    return get_writer().submit("traffic_logs", TRAFFIC_LOG_INSERT, data)
+
+
+def insert_traffic_logs(rows):
+    """Bulk insert: every row in one executemany transaction, written now."""
+    return get_writer().write_now("traffic_logs", TRAFFIC_LOG_INSERT, rows)
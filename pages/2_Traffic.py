@@ -1,15 +1,20 @@
 import streamlit as st
 import uuid
-import cv2
-import numpy as np
 from datetime import datetime
-from ultralytics import YOLO
 
 from databases.traffic_detection_db import insert_traffic_log
+from databases.event_writer import write_failure_notice
 from utils.email_alert import send_alert_email
 from databases.alerts_db import insert_system_alert
-from utils.s3_uploader import upload_image_to_s3
-from utils.model_loader import ensure_model
+from utils.s3_uploader import encode_image, upload_image_async
+from utils.stream_ingest import ingest, ingest_bytes
+from utils.detection_rules import congestion_level, is_peak_hour
+from utils.traffic_batch import decode, run_batch
+from utils.city_data import CITY_AREA_DATA
+from utils.inference_config import predict_kwargs
+from utils.detections import draw_boxes
+from utils.inference_client import InferenceError, InferenceTimeout, detect
+from utils.result_cache import cache_key, get_cache
 
 
 st.set_page_config(page_title="Traffic Detection", layout="wide")
@@ -42,30 +47,6 @@ st.markdown("""
 
 st.markdown('<div class="title">🚦 Traffic Detection Dashboard</div>', unsafe_allow_html=True)
 
-# ---------- city + area coords ----------
-CITY_AREA_DATA = {
-    "Chennai": {
-        "T Nagar": (13.0418, 80.2337),
-        "Anna Nagar": (13.0850, 80.2101)
-    },
-    "Coimbatore": {
-        "Gandhipuram": (11.0183, 76.9725),
-        "RS Puram": (11.0089, 76.9510)
-    },
-    "Madurai": {
-        "Anna Nagar": (9.9391, 78.1384),
-        "KK Nagar": (9.9173, 78.1192)
-    },
-    "Tiruchirappalli": {
-        "Srirangam": (10.8623, 78.6932),
-        "Thillai Nagar": (10.8186, 78.6828)
-    },
-    "Salem": {
-        "Fairlands": (11.6643, 78.1460),
-        "Hasthampatti": (11.6710, 78.1348)
-    }
-}
-
 left, right = st.columns([1,1])
 
 # ================= LEFT =================
@@ -96,8 +77,53 @@ with left:
         st.caption("Longitude")
         st.code(f"{lon:.6f}")
 
-    uploaded = st.file_uploader("Upload Traffic Image", type=["jpg","jpeg","png"])
-    detect_btn = st.button("🚦 Detect Traffic")
+    batch_mode = st.checkbox("Batch mode (multiple camera snapshots)")
+
+    uploaded, detect_btn = None, False
+    batch_files, batch_btn = [], False
+
+    if batch_mode:
+        batch_files = st.file_uploader(
+            "Upload Traffic Images",
+            type=["jpg","jpeg","png"],
+            accept_multiple_files=True
+        )
+        batch_btn = st.button("🚦 Detect Batch")
+    else:
+        uploaded = st.file_uploader("Upload Traffic Image", type=["jpg","jpeg","png"])
+        detect_btn = st.button("🚦 Detect Traffic")
+
+    with st.expander("🎥 Video / camera stream"):
+        video = st.file_uploader("Upload Video", type=["mp4","avi","mov","mkv"])
+        stream_url = st.text_input("…or stream URL (rtsp://)")
+        window_secs = st.number_input("Window (seconds)", 10, 600, 60)
+        video_btn = st.button("🚦 Analyze Video")
+
+        if video_btn and (video or stream_url):
+            with st.spinner("Sampling frames and detecting..."):
+                if video:
+                    events, vstats = ingest_bytes(
+                        video.getvalue(),
+                        "." + video.name.rsplit(".", 1)[-1],
+                        city, area,
+                        modes=("traffic",),
+                        window_secs=window_secs
+                    )
+                else:
+                    # live streams never end: read about one window at ~30 fps
+                    events, vstats = ingest(
+                        stream_url, city, area,
+                        modes=("traffic",),
+                        window_secs=window_secs,
+                        max_frames=int(window_secs * 30)
+                    )
+
+            st.dataframe(events, width="stretch")
+            st.caption(
+                f"Frames in: {vstats['frames_in']} · inferred: {vstats['frames_inferred']} · "
+                f"latency: {vstats['ms_per_inferred_frame']} ms/frame · "
+                f"{sum(e['logged'] for e in events)} of {len(events)} events logged"
+            )
 
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -106,60 +132,80 @@ with right:
     st.markdown('<div class="card">', unsafe_allow_html=True)
     st.markdown('<div class="subtitle">🧠 Detection Result</div>', unsafe_allow_html=True)
 
-    if uploaded and detect_btn:
+    if batch_files and batch_btn:
+
+        with st.spinner(f"Detecting vehicles in {len(batch_files)} images..."):
+            images = ((f.name, decode(f.getvalue())) for f in batch_files)
+            batch_results, stats = run_batch(images, city, area)
+
+        st.dataframe(
+            [
+                {
+                    "Image": r["image"],
+                    "Vehicles": r["vehicle_count"],
+                    "Congestion": r["congestion"]
+                }
+                for r in batch_results
+            ],
+            width="stretch"
+        )
 
-        lat, lon = CITY_AREA_DATA[city][area]
+        if stats["stored"]:
+            st.success(f"✅ {stats['images']} traffic logs stored in database")
+        else:
+            st.error("Batch insert failed — see server log")
 
-        with st.spinner("Loading model and detecting vehicles..."):
-            ensure_model(
-                "models/traffic_best.pt",
-                "models/traffic_best.pt"
-            )
+        st.info(f"Processed {stats['images']} images in {stats['secs']}s "
+                f"({stats['images_per_sec']} images/sec)")
 
-            model = YOLO("models/traffic_best.pt")
+    elif uploaded and detect_btn:
 
+        lat, lon = CITY_AREA_DATA[city][area]
 
-        file_bytes = np.asarray(bytearray(uploaded.read()), dtype=np.uint8)
-        img = cv2.imdecode(file_bytes, 1)
+        file_bytes = uploaded.read()
+        cache = get_cache()
+        key = cache_key(file_bytes, "traffic", predict_kwargs("traffic"))
+        cached = cache.get(key)
 
-        results = model(img)[0]
-        boxes = results.boxes
+        # decoded at reduced size when far larger than the model input
+        img = decode(file_bytes)
 
-        count = 0
+        if cached is None:
+            # runs in the inference workers, not in this session's thread
+            with st.spinner("Detecting vehicles..."):
+                try:
+                    detections = detect("traffic", file_bytes)
+                except (InferenceTimeout, InferenceError) as e:
+                    st.error(f"Detection failed: {e}")
+                    st.stop()
 
-        if boxes is not None and len(boxes) > 0:
+            draw_boxes(img, detections, (0,200,0))
 
-            for box in boxes:
-                x1,y1,x2,y2 = map(int, box.xyxy[0])
-                cv2.rectangle(img,(x1,y1),(x2,y2),(0,200,0),3)
-                count += 1
+            # after drawing bounding boxes — uploaded in the background
+            data, ext = encode_image(img)
 
-        st.image(img, channels="BGR", width=500)
-      
+            image_url = upload_image_async(data, category="traffic", ext=ext)
 
-        # after drawing bounding boxes
-        cv2.imwrite("temp.jpg", img)
+            cached = cache.put(key, {"detections": detections, "image_url": image_url})
+        else:
+            # same frame as an earlier run: no inference, no new upload
+            draw_boxes(img, cached["detections"], (0,200,0))
+            st.caption("♻️ Same image as an earlier run — reusing its result")
 
-        image_url = upload_image_to_s3(
-        local_path="temp.jpg",
-        category="traffic"
-        )
+        st.image(img, channels="BGR", width=500)
+
+        count = len(cached["detections"]["boxes"])
+        image_url = cached["image_url"]
 
 
         # -------- congestion logic --------
-        if count < 10:
-            congestion = "low"
-        elif count < 25:
-            congestion = "medium"
-        else:
-            congestion = "high"
+        congestion = congestion_level(count)
 
         #st.success(f"Vehicle Count: {count}")
         st.info(f"Congestion Level: {congestion}")
 
         # -------- peak hour --------
-        h = datetime.now().hour
-        is_peak = (8 <= h <= 11) or (17 <= h <= 20)
+        is_peak = is_peak_hour(datetime.now())
 
         # -------- DB LOG --------
         data = (
@@ -174,10 +220,13 @@ with right:
             image_url
         )
 
-        insert_traffic_log(data)
+        # identical input for the same location is only logged (and alerted) once
+        first_log = cache.mark_logged(key, f"{city}-{area}")
+        if first_log:
+            log_ok = insert_traffic_log(data)
 
         # -------- EMAIL ALERT (only for high) --------
-        if congestion == "high":
+        if first_log and congestion == "high":
 
             subject = "🚨 UrbanBot Traffic Congestion Alert"
 
@@ -209,7 +258,16 @@ with right:
             else:
                 st.warning(f"Email failed: {email_result}")
 
-        st.success("✅ Traffic log stored in database")
+        if first_log and log_ok:
+            st.success("✅ Traffic log queued for the database")
+        elif first_log:
+            st.error("Traffic log could not be written — see server log")
+        else:
+            st.info("Already logged for this location — duplicate insert skipped")
+
+        write_notice = write_failure_notice()
+        if write_notice:
+            st.warning(write_notice)
 
         st.info(f"""
         **Logged Metadata**
@@ -222,6 +280,6 @@ with right:
         """)
 
     else:
-        st.write("Upload an image and click **Detect Traffic**.")
+        st.write("Upload an image and click **Detect Traffic**, or switch to batch mode.")
 
     st.markdown('</div>', unsafe_allow_html=True)
@@ -1,16 +1,17 @@
 import streamlit as st
-import torch
-import cv2
-import numpy as np
-import torchvision.transforms as T
 from datetime import datetime
 import uuid
 from utils.email_alert import send_alert_email
 from databases.alerts_db import insert_system_alert
 
 from databases.crowd_density_db import insert_crowd_log
-from utils.s3_uploader import upload_image_to_s3
-from utils.model_loader import ensure_model
+from databases.event_writer import write_failure_notice
+from utils.s3_uploader import encode_image, upload_image_async
+from utils.city_data import CITY_AREA_DATA
+from utils.crowd_net import CROWD_BACKEND, MAX_SIDE, TILE, TILE_MARGIN
+from utils.inference_client import InferenceError, InferenceTimeout, crowd_count
+from utils.image_decode import decode_image
+from utils.result_cache import cache_key, get_cache
 
 
 # ---------------- PAGE CONFIG ----------------
@@ -54,62 +55,7 @@ st.markdown("""
 st.markdown('<div class="title">👥 Crowd Density Dashboard</div>', unsafe_allow_html=True)
 
 # ---------------- MODEL ----------------
-import torch.nn as nn
-from torchvision import models
-
-class CrowdNet(nn.Module):
-    def __init__(self):
-        super().__init__()
-        vgg = models.vgg16(weights=None)
-        self.frontend = nn.Sequential(*list(vgg.features.children())[:23])
-        self.backend = nn.Sequential(
-            nn.Conv2d(512,512,3,padding=2,dilation=2), nn.ReLU(),
-            nn.Conv2d(512,256,3,padding=2,dilation=2), nn.ReLU(),
-            nn.Conv2d(256,128,3,padding=2,dilation=2), nn.ReLU(),
-            nn.Conv2d(128,64,3,padding=2,dilation=2), nn.ReLU(),
-        )
-        self.output_layer = nn.Conv2d(64,1,1)
-
-    def forward(self,x):
-        return self.output_layer(self.backend(self.frontend(x)))
-
-@st.cache_resource
-def load_model():
-    ensure_model(
-        "models/crowd_density_cc50_v1.pth",
-        "models/crowd_density_cc50_v1.pth"
-    )
-    m = CrowdNet()
-    m.load_state_dict(torch.load("models/crowd_density_cc50_v1.pth", map_location="cpu"))
-    m.eval()
-    return m
-
-model = load_model()
-transform = T.ToTensor()
-
-# ---------------- CITY COORDS ----------------
-CITY_AREA_DATA = {
-    "Chennai": {
-        "T Nagar": (13.0418, 80.2337),
-        "Anna Nagar": (13.0850, 80.2101)
-    },
-    "Coimbatore": {
-        "Gandhipuram": (11.0183, 76.9725),
-        "RS Puram": (11.0089, 76.9510)
-    },
-    "Madurai": {
-        "Anna Nagar": (9.9391, 78.1384),
-        "KK Nagar": (9.9173, 78.1192)
-    },
-    "Tiruchirappalli": {
-        "Srirangam": (10.8623, 78.6932),
-        "Thillai Nagar": (10.8186, 78.6828)
-    },
-    "Salem": {
-        "Fairlands": (11.6643, 78.1460),
-        "Hasthampatti": (11.6710, 78.1348)
-    }
-}
+st.caption(f"Crowd model backend: {CROWD_BACKEND}")
 
 # ---------------- DENSITY LEVEL ----------------
 def density_level(count):
@@ -133,16 +79,6 @@ def level_class(level):
         "Extreme":"level-extreme"
     }[level]
 
-# ---------------- PREDICT ----------------
-def predict(img):
-    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    h,w = rgb.shape[:2]
-    rgb = cv2.resize(rgb,(w-w%8,h-h%8))
-    x = transform(rgb).unsqueeze(0)
-    with torch.no_grad():
-        dmap = model(x).squeeze().numpy()
-    return dmap.sum(), dmap
-
 # ---------------- LAYOUT ----------------
 left, right = st.columns([1,1])
 
@@ -186,24 +122,42 @@ with right:
 
         lat, lon = CITY_AREA_DATA[city][area]
 
-        file_bytes = np.asarray(bytearray(uploaded.read()), dtype=np.uint8)
-        img = cv2.imdecode(file_bytes, 1)
-
-        with st.spinner("Analyzing crowd density..."):
-            count, dmap = predict(img)
-
+        file_bytes = uploaded.read()
+        cache = get_cache()
+        key = cache_key(file_bytes, "crowd", {
+            "backend": CROWD_BACKEND, "max_side": MAX_SIDE, "tile": TILE, "margin": TILE_MARGIN
+        })
+        cached = cache.get(key)
+
+        # images far above CROWD_MAX_SIDE are decoded at reduced size
+        img = decode_image(file_bytes, MAX_SIDE)
+
+        if cached is None:
+            # runs in the inference workers; large images are downscaled /
+            # tiled there so memory stays bounded
+            with st.spinner("Analyzing crowd density..."):
+                try:
+                    count = crowd_count(file_bytes)
+                except (InferenceTimeout, InferenceError) as e:
+                    st.error(f"Crowd estimation failed: {e}")
+                    st.stop()
+
+            # uploaded in the background
+            data, ext = encode_image(img)
+
+            image_url = upload_image_async(data, category="crowd", ext=ext)
+
+            cached = cache.put(key, {"count": count, "image_url": image_url})
+        else:
+            # same image as an earlier run: no inference, no new upload
+            st.caption("♻️ Same image as an earlier run — reusing its result")
+
+        count = cached["count"]
+        image_url = cached["image_url"]
         level = density_level(count)
 
         st.image(img, channels="BGR", width=500)
-        # after drawing bounding boxes
-        cv2.imwrite("temp.jpg", img)
 
-        image_url = upload_image_to_s3(
-        local_path="temp.jpg",
-        category="crowd"
-        )
-
-        
 
         st.markdown(
             f'<div class="{level_class(level)}">Density Level: {level}</div>',
@@ -222,14 +176,23 @@ with right:
           image_url
         )
 
-        try:
-            insert_crowd_log(data)
-            st.success("✅ Crowd log stored in database")
-        except Exception as e:
-            st.error(f"DB Save Failed: {e}")
+        # identical input for the same location is only logged (and alerted) once
+        first_log = cache.mark_logged(key, f"{city}-{area}")
+        if first_log:
+            # queued for the background writer; False only if a direct write failed
+            if insert_crowd_log(data):
+                st.success("✅ Crowd log queued for the database")
+            else:
+                st.error("Crowd log could not be written — see server log")
+        else:
+            st.info("Already logged for this location — duplicate insert skipped")
+
+        write_notice = write_failure_notice()
+        if write_notice:
+            st.warning(write_notice)
 
         # ---------------- EMAIL ALERT ----------------
-        if level == "Extreme":
+        if first_log and level == "Extreme":
             current_time = datetime.now()
 
             subject = "🚨 UrbanBot Crowd Density Alert"
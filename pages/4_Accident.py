@@ -1,14 +1,19 @@
 import streamlit as st
 import uuid
-import cv2
-import numpy as np
 from datetime import datetime
-from ultralytics import YOLO
 from databases.accident_detection_db import insert_accident_log
+from databases.event_writer import write_failure_notice
 from utils.email_alert import send_alert_email
 from databases.alerts_db import insert_system_alert
-from utils.s3_uploader import upload_image_to_s3
-from utils.model_loader import ensure_model
+from utils.s3_uploader import encode_image, upload_image_async
+from utils.stream_ingest import ingest, ingest_bytes
+from utils.detection_rules import accident_severity
+from utils.city_data import CITY_AREA_DATA
+from utils.image_decode import decode_image
+from utils.inference_config import inference_settings, predict_kwargs
+from utils.detections import draw_boxes
+from utils.inference_client import InferenceError, InferenceTimeout, detect
+from utils.result_cache import cache_key, get_cache
 
 st.set_page_config(page_title="Accident Detection", layout="wide")
 
@@ -40,29 +45,6 @@ st.markdown("""
 
 st.markdown('<div class="title">🚨 Accident Detection Dashboard</div>', unsafe_allow_html=True)
 
-# ---------- city coords ----------
-CITY_AREA_DATA = {
-    "Chennai": {
-        "T Nagar": (13.0418, 80.2337),
-        "Anna Nagar": (13.0850, 80.2101)
-    },
-    "Coimbatore": {
-        "Gandhipuram": (11.0183, 76.9725),
-        "RS Puram": (11.0089, 76.9510)
-    },
-    "Madurai": {
-        "Anna Nagar": (9.9391, 78.1384),
-        "KK Nagar": (9.9173, 78.1192)
-    },
-    "Tiruchirappalli": {
-        "Srirangam": (10.8623, 78.6932),
-        "Thillai Nagar": (10.8186, 78.6828)
-    },
-    "Salem": {
-        "Fairlands": (11.6643, 78.1460),
-        "Hasthampatti": (11.6710, 78.1348)
-    }
-}
 left, right = st.columns([1,1])
 
 # ================= LEFT =================
@@ -93,6 +75,38 @@ with left:
     uploaded = st.file_uploader("Upload Accident Image", type=["jpg","jpeg","png"])
     detect_btn = st.button("🚨 Detect Accident")
 
+    with st.expander("🎥 Video / camera stream"):
+        video = st.file_uploader("Upload Video", type=["mp4","avi","mov","mkv"])
+        stream_url = st.text_input("…or stream URL (rtsp://)")
+        window_secs = st.number_input("Window (seconds)", 10, 600, 60)
+        video_btn = st.button("🚨 Analyze Video")
+
+        if video_btn and (video or stream_url):
+            with st.spinner("Sampling frames and detecting..."):
+                if video:
+                    events, vstats = ingest_bytes(
+                        video.getvalue(),
+                        "." + video.name.rsplit(".", 1)[-1],
+                        city, area,
+                        modes=("accident",),
+                        window_secs=window_secs
+                    )
+                else:
+                    # live streams never end: read about one window at ~30 fps
+                    events, vstats = ingest(
+                        stream_url, city, area,
+                        modes=("accident",),
+                        window_secs=window_secs,
+                        max_frames=int(window_secs * 30)
+                    )
+
+            st.dataframe(events, width="stretch")
+            st.caption(
+                f"Frames in: {vstats['frames_in']} · inferred: {vstats['frames_inferred']} · "
+                f"latency: {vstats['ms_per_inferred_frame']} ms/frame · "
+                f"{sum(e['logged'] for e in events)} of {len(events)} events logged"
+            )
+
     st.markdown('</div>', unsafe_allow_html=True)
 
 
@@ -105,104 +119,118 @@ with right:
 
         lat, lon = CITY_AREA_DATA[city][area]
 
-        with st.spinner("Loading model and detecting..."):
-            ensure_model("models/accident_best.pt","models/accident_best.pt")
+        file_bytes = uploaded.read()
+        cache = get_cache()
+        key = cache_key(file_bytes, "accident", predict_kwargs("accident"))
+        cached = cache.get(key)
 
-            model = YOLO("models/accident_best.pt")
+        # decoded at reduced size when far larger than the model input
+        img = decode_image(file_bytes, inference_settings("accident")["imgsz"])
 
-        file_bytes = np.asarray(bytearray(uploaded.read()), dtype=np.uint8)
-        img = cv2.imdecode(file_bytes, 1)
+        if cached is None:
+            # runs in the inference workers, not in this session's thread
+            with st.spinner("Detecting..."):
+                try:
+                    detections = detect("accident", file_bytes)
+                except (InferenceTimeout, InferenceError) as e:
+                    st.error(f"Detection failed: {e}")
+                    st.stop()
+            image_url = None
 
-        results = model(img)[0]
-        boxes = results.boxes
+            if detections["boxes"]:
+                draw_boxes(img, detections, (0,180,0))
 
-        confidence_max = 0
+                # after drawing bounding boxes — uploaded in the background
+                data, ext = encode_image(img)
 
-         # after drawing bounding boxes
-        cv2.imwrite("temp.jpg", img)
+                image_url = upload_image_async(data, category="accident", ext=ext)
 
-        image_url = upload_image_to_s3(
-        local_path="temp.jpg",
-        category="accident"
-        )
+            cached = cache.put(key, {"detections": detections, "image_url": image_url})
+        else:
+            # same frame as an earlier run: no inference, no new upload
+            draw_boxes(img, cached["detections"], (0,180,0))
+            st.caption("♻️ Same image as an earlier run — reusing its result")
 
-        if boxes is not None and len(boxes) > 0:
+        detections = cached["detections"]
 
-            for box in boxes:
-                x1,y1,x2,y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                confidence_max = max(confidence_max, conf)
-                cv2.rectangle(img,(x1,y1),(x2,y2),(0,180,0),3)
+        if detections["boxes"]:
+
+            confidence_max = max(detections["conf"])
+            image_url = cached["image_url"]
 
             st.image(img, channels="BGR", width=500)
 
             st.error("⚠️ Accident Detected")
-            
-
-         
 
 
             # -------- auto severity --------
-            if confidence_max >= 0.80:
-                severity = "high"
-            elif confidence_max >= 0.50:
-                severity = "medium"
-            else:
-                severity = "low"
+            severity = accident_severity(confidence_max)
+
+            # identical input for the same location is only logged (and alerted) once
+            if cache.mark_logged(key, f"{city}-{area}"):
 
-            #Email alert
-            current_time = datetime.now()
-            subject = "🚨 UrbanBot Accident Alert"
-            body = f"""Accident detected!
-            Time:{current_time}
-            City: {city}
-            Coordinates: {lat}, {lon}
-            Severity: {severity}
-            Confidence: {round(confidence_max,3)}
+                #Email alert
+                current_time = datetime.now()
+                subject = "🚨 UrbanBot Accident Alert"
+                body = f"""Accident detected!
+                Time:{current_time}
+                City: {city}
+                Coordinates: {lat}, {lon}
+                Severity: {severity}
+                Confidence: {round(confidence_max,3)}
 
-            Please take immediate action."""
+                Please take immediate action."""
 
             
             
-            email_result = send_alert_email(subject, body)
+                email_result = send_alert_email(subject, body)
 
-            email_ok = (email_result == True)
+                email_ok = (email_result == True)
 
    
 
-            data = (
-                str(uuid.uuid4()),
-                datetime.now(),
-                image_url,
-                city,
-                area,
-                lat,
-                lon,
-                severity,
-                email_ok
-            )
+                data = (
+                    str(uuid.uuid4()),
+                    datetime.now(),
+                    image_url,
+                    city,
+                    area,
+                    lat,
+                    lon,
+                    severity,
+                    email_ok
+                )
 
-            insert_accident_log(data)
+                log_ok = insert_accident_log(data)
 
 
-            insert_system_alert(
-               alert_type="accident",
-               location=city,
-               severity=severity,
-               message=subject,
-               email_sent=email_ok
-            )
+                insert_system_alert(
+                   alert_type="accident",
+                   location=city,
+                   severity=severity,
+                   message=subject,
+                   email_sent=email_ok
+                )
 
 
-            if email_result == True:
-                 st.error("🚨 Accident detected — Alert email sent")
-            else:
-                st.warning(f"Email failed: {email_result}")
+                if email_result == True:
+                     st.error("🚨 Accident detected — Alert email sent")
+                else:
+                    st.warning(f"Email failed: {email_result}")
 
 
      
 
-            st.success("✅ Accident stored in database")
+                if log_ok:
+                    st.success("✅ Accident queued for the database")
+                else:
+                    st.error("Accident log could not be written — see server log")
+            else:
+                st.info("Already logged for this location — duplicate insert skipped")
+
+            write_notice = write_failure_notice()
+            if write_notice:
+                st.warning(write_notice)
 
             st.info(f"""
             **Logged Metadata**
@@ -1,12 +1,15 @@
 import streamlit as st
 import uuid
-import cv2
-import numpy as np
 from datetime import datetime
-from ultralytics import YOLO
 from databases.road_damage_db import insert_road_damage
-from utils.s3_uploader import upload_image_to_s3
-from utils.model_loader import ensure_model
+from databases.event_writer import write_failure_notice
+from utils.s3_uploader import encode_image, upload_image_async
+from utils.city_data import CITY_AREA_DATA
+from utils.image_decode import decode_image, image_size
+from utils.inference_config import inference_settings, predict_kwargs
+from utils.detections import draw_boxes
+from utils.inference_client import InferenceError, InferenceTimeout, detect
+from utils.result_cache import cache_key, get_cache
 
 st.set_page_config(page_title="Road Damage Detection", layout="wide")
 
@@ -41,40 +44,6 @@ st.markdown("""
 
 st.markdown('<div class="title">🛣 Road Damage Detection Dashboard</div>', unsafe_allow_html=True)
 
-# ---------- load YOLO once ----------
-@st.cache_resource
-def load_model():
-    ensure_model(
-        "models/road_damage_yolo.pt",
-        "models/road_damage_yolo.pt"
-    )
-    return YOLO("models/road_damage_yolo.pt")
-
-model = load_model()
-
-CITY_AREA_DATA = {
-    "Chennai": {
-        "T Nagar": (13.0418, 80.2337),
-        "Anna Nagar": (13.0850, 80.2101)
-    },
-    "Coimbatore": {
-        "Gandhipuram": (11.0183, 76.9725),
-        "RS Puram": (11.0089, 76.9510)
-    },
-    "Madurai": {
-        "Anna Nagar": (9.9391, 78.1384),
-        "KK Nagar": (9.9173, 78.1192)
-    },
-    "Tiruchirappalli": {
-        "Srirangam": (10.8623, 78.6932),
-        "Thillai Nagar": (10.8186, 78.6828)
-    },
-    "Salem": {
-        "Fairlands": (11.6643, 78.1460),
-        "Hasthampatti": (11.6710, 78.1348)
-    }
-}
-
 left, right = st.columns([1, 1])
 
 # ================= LEFT PANEL =================
@@ -118,33 +87,55 @@ with right:
     st.markdown('<div class="subtitle">🧠 Detection Result</div>', unsafe_allow_html=True)
 
     if uploaded and detect_btn:
-        file_bytes = np.asarray(bytearray(uploaded.read()), dtype=np.uint8)
-        img = cv2.imdecode(file_bytes, 1)
+        file_bytes = uploaded.read()
+        cache = get_cache()
+        key = cache_key(file_bytes, "road_damage", predict_kwargs("road_damage"))
+        cached = cache.get(key)
+
+        # decoded at reduced size when far larger than the model input
+        img = decode_image(file_bytes, inference_settings("road_damage")["imgsz"])
+
+        damage_classes = {"pothole", "manhole", "crack"}
+
+        if cached is None:
+            # runs in the inference workers, not in this session's thread
+            with st.spinner("Detecting road damage..."):
+                try:
+                    detections = detect("road_damage", file_bytes)
+                except (InferenceTimeout, InferenceError) as e:
+                    st.error(f"Detection failed: {e}")
+                    st.stop()
+            annotated_img = draw_boxes(img.copy(), detections, (0,0,255), labels=True)
 
-        results = model(img)[0]
-        annotated_img = results.plot()
+            image_url = None
+            if any(c in damage_classes for c in detections["names"]):
+                data, ext = encode_image(annotated_img)
+
+                # uploaded in the background
+                image_url = upload_image_async(data, category="road_damage", ext=ext)
+
+            cached = cache.put(key, {"detections": detections, "image_url": image_url})
+        else:
+            # same image as an earlier run: no inference, no new upload
+            annotated_img = draw_boxes(img.copy(), cached["detections"], (0,0,255), labels=True)
+            st.caption("♻️ Same image as an earlier run — reusing its result")
 
         st.image(annotated_img, caption="Annotated Detection", channels="BGR",  width="stretch")
 
-        detected_classes = [model.names[int(c)] for c in results.boxes.cls]
+        detected_classes = cached["detections"]["names"]
 
-        damage_classes = {"pothole", "manhole", "crack"}
         found_damage = [c for c in detected_classes if c in damage_classes]
 
         if found_damage:
             st.error(f"⚠️ Detected: {', '.join(set(found_damage))}")
 
             image_id = str(uuid.uuid4())
-            cv2.imwrite("temp.jpg", annotated_img)
-
-            image_url = upload_image_to_s3(
-            local_path="temp.jpg",
-            category="road_damage"
-            )
+            image_url = cached["image_url"]
 
-            
             timestamp = datetime.now()
-            resolution = f"{img.shape[1]}x{img.shape[0]}"
+            # original upload resolution, not the reduced decode
+            width, height = image_size(file_bytes) or (img.shape[1], img.shape[0])
+            resolution = f"{width}x{height}"
 
             data = (
                 image_id,
@@ -161,8 +152,18 @@ with right:
                 True
             )
 
-            insert_road_damage(data)
-            st.success("✅ Incident stored in database")
+            # identical input for the same location is only logged once
+            if cache.mark_logged(key, f"{city}-{area}"):
+                if insert_road_damage(data):
+                    st.success("✅ Incident queued for the database")
+                else:
+                    st.error("Incident could not be written — see server log")
+            else:
+                st.info("Already logged for this location — duplicate insert skipped")
+
+            write_notice = write_failure_notice()
+            if write_notice:
+                st.warning(write_notice)
 
             st.info(f"""
             **Logged Metadata**
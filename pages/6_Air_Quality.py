@@ -1,56 +1,19 @@
 import streamlit as st
 import pandas as pd
-import joblib
-import matplotlib.pyplot as plt
 from databases.aqi_db import insert_aqi_log
+from databases.event_writer import write_failure_notice
 from datetime import datetime
-from utils.model_loader import ensure_model
+from utils.aqi_batch import score_csv
+from utils.aqi_forecast import MAX_HORIZON, forecast, forecast_chart
+from utils.aqi_models import arima_cities, get_rf
+from utils.aqi_spatial import aqi_at
+from utils.city_data import AQI_CITY_COORDS
+from utils.detection_rules import aqi_category
 
 
 
 
-# ---------- load models ----------
-def load_models():
-
-    # -------- ensure models from S3 --------
-    ensure_model("models/aqi_calculation.pkl", "models/aqi_calculation.pkl")
-    ensure_model("models/aqi_calc_columns.pkl", "models/aqi_calc_columns.pkl")
-
-    ensure_model("models/chennai_arima.pkl", "models/chennai_arima.pkl")
-    ensure_model("models/bangalore_arima.pkl", "models/bangalore_arima.pkl")
-    ensure_model("models/delhi_arima.pkl", "models/delhi_arima.pkl")
-    ensure_model("models/jaipur_arima.pkl", "models/jaipur_arima.pkl")
-
-    # -------- load locally (after ensured) --------
-    rf_model = joblib.load("models/aqi_calculation.pkl")
-    cols = joblib.load("models/aqi_calc_columns.pkl")
-
-    arima_models = {
-        "Chennai": joblib.load("models/chennai_arima.pkl"),
-        "Bengaluru": joblib.load("models/bangalore_arima.pkl"),
-        "Delhi": joblib.load("models/delhi_arima.pkl"),
-        "Jaipur": joblib.load("models/jaipur_arima.pkl"),
-    }
-
-    return rf_model, cols, arima_models
-
-
-
 # ---------- rules ----------
-def aqi_category(aqi):
-
-    if aqi <= 50:
-        return "Good"
-
-    elif aqi <= 200:
-        return "Moderate"
-
-    elif aqi <= 400:
-        return "Poor"
-
-    else:
-        return "Severe"
-    
 def aqi_badge(cat):
     return {
         "Good": "GOOD 🟢",
@@ -78,12 +41,6 @@ def health_message(cat):
         "Severe": "Health alert — stay indoors"
     }[cat]
 
-CITY_COORDS = {
-    "Chennai": (13.0827, 80.2707),
-    "Bengaluru": (12.9716, 77.5946),
-    "Delhi": (28.6139, 77.2090),
-    "Jaipur": (26.9124, 75.7873)
-}
 
 
 # ---------- page ----------
@@ -91,9 +48,8 @@ def show_aqi_page():
 
     st.header("🌍 AQI Intelligence Module")
 
-    rf_model, model_cols, arima_models = load_models()
-    if rf_model is None:
-        return
+    # loaded once per process; ARIMA models load on their first forecast
+    rf_model, model_cols = get_rf()
 
     # -----------------------
     # Predictor Section
@@ -105,8 +61,8 @@ def show_aqi_page():
     col1, col2 = st.columns(2)
 
     with col1:
-        city = st.selectbox("City", list(CITY_COORDS.keys()))
-        default_lat, default_lon = CITY_COORDS[city]
+        city = st.selectbox("City", list(AQI_CITY_COORDS.keys()))
+        default_lat, default_lon = AQI_CITY_COORDS[city]
 
         station = st.text_input(
              "Monitoring Station",
@@ -163,12 +119,14 @@ def show_aqi_page():
            cat
         )
 
-        try:
-            insert_aqi_log(data)
-            st.success("AQI log saved ✅")
+        if insert_aqi_log(data):
+            st.success("AQI log queued for the database ✅")
+        else:
+            st.error("AQI log could not be written — see server log")
 
-        except Exception as e:
-            st.error(f"AQI DB insert failed: {e}")
+        write_notice = write_failure_notice()
+        if write_notice:
+            st.warning(write_notice)
         # 🎨 color badge
         color_map = {
             "Good": "#2ecc71",
@@ -200,6 +158,57 @@ def show_aqi_page():
 
         st.caption(health_message(cat))
 
+    # -----------------------
+    # Bulk Scoring Section
+    # -----------------------
+    st.subheader("Bulk AQI Scoring")
+    st.caption(
+        "CSV with pm25, pm10, no, no2, nox, co, so2, o3 (optional: timestamp, city, "
+        "monitoring_station, latitude, longitude). Missing city / station use the selection above."
+    )
+
+    bulk_file = st.file_uploader("Upload readings CSV", type=["csv"])
+    bulk_store = st.checkbox("Store results in aqi_logs", value=True)
+
+    if bulk_file and st.button("Score CSV"):
+        try:
+            with st.spinner("Scoring readings..."):
+                scored, stats = score_csv(bulk_file, city, station, store=bulk_store)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.info(
+                f"Scored {stats['scored']} of {stats['rows']} rows "
+                f"({stats['rejected']} rejected) — {stats['rows_per_sec']} rows/sec"
+            )
+            if bulk_store:
+                if stats["store_failed"]:
+                    st.error(f"{stats['store_failed']} rows failed to store — see server log")
+                else:
+                    st.success(f"{stats['stored']} AQI logs saved ✅")
+
+            if scored is not None:
+                st.dataframe(scored["aqi_category"].value_counts().rename("rows"))
+                st.dataframe(scored.head(200), width="stretch")
+
+    # -----------------------
+    # Spatial Section
+    # -----------------------
+    st.subheader("AQI at a Location")
+    st.caption("Interpolated from the latest reading of each monitoring station in the selected city.")
+
+    if st.button("Estimate AQI Here"):
+        try:
+            point = aqi_at(city, latitude, longitude)
+        except ValueError:
+            st.warning(f"No recent located station readings for {city}")
+        else:
+            st.metric("Estimated AQI", point["aqi"])
+            st.markdown(f"**{aqi_badge(point['aqi_category'])}** — {health_message(point['aqi_category'])}")
+            st.caption(
+                f"{point['stations']} stations — nearest {point['nearest_station_km']} km away"
+            )
+
     # -----------------------
     # Forecast Section
     # -----------------------
@@ -218,13 +227,12 @@ def show_aqi_page():
         </style>
     """, unsafe_allow_html=True)
 
-    city = st.selectbox("Select City", list(arima_models.keys()))
-    days = st.slider("Forecast Days", 1, 14, 5)
+    city = st.selectbox("Select City", arima_cities())
+    days = st.slider("Forecast Days", 1, MAX_HORIZON, min(5, MAX_HORIZON))
 
     if st.button("Run Forecast"):
-        model = arima_models[city]
-        fc = model.get_forecast(steps=days)
-        mean = fc.predicted_mean
+        # computed once per city / model / day, sliced to the requested days
+        mean = forecast(city, days)
 
         col1, col2 = st.columns(2)
 
@@ -260,14 +268,7 @@ def show_aqi_page():
 
             st.subheader("AQI Trend")
 
-            fig, ax = plt.subplots(figsize=(6,3))
-            ax.plot(mean.index, mean.values, marker="o")
-            ax.set_title("AQI Forecast Trend")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("AQI")
-            ax.tick_params(axis="x", rotation=45)
-
-            st.pyplot(fig)
+            st.image(forecast_chart(city, days), width="stretch")
 
     st.markdown('</div>', unsafe_allow_html=True)
 
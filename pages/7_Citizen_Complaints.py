@@ -2,6 +2,7 @@ import streamlit as st
 import nltk
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from databases.citizen_complaint_db import insert_complaint, fetch_complaints
+from utils.city_data import CITY_AREA_DATA
 
 nltk.download('vader_lexicon')
 sia = SentimentIntensityAnalyzer()
@@ -53,30 +54,6 @@ h1, h2, h3 {
 
 st.title("🗣 Citizen Complaint AI Dashboard")
 
-# ---------- city coordinates ----------
-CITY_AREA_DATA = {
-    "Chennai": {
-        "T Nagar": (13.0418, 80.2337),
-        "Anna Nagar": (13.0850, 80.2101)
-    },
-    "Coimbatore": {
-        "Gandhipuram": (11.0183, 76.9725),
-        "RS Puram": (11.0089, 76.9510)
-    },
-    "Madurai": {
-        "Anna Nagar": (9.9391, 78.1384),
-        "KK Nagar": (9.9173, 78.1192)
-    },
-    "Tiruchirappalli": {
-        "Srirangam": (10.8623, 78.6932),
-        "Thillai Nagar": (10.8186, 78.6828)
-    },
-    "Salem": {
-        "Fairlands": (11.6643, 78.1460),
-        "Hasthampatti": (11.6710, 78.1348)
-    }
-}
-
 dept_map = {
     "road": "Roads Department",
     "water": "Water Board",
@@ -1,11 +1,12 @@
 import streamlit as st
-import mysql.connector
 from langchain_groq import ChatGroq
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import smtplib
 from decimal import Decimal
 import os
+from databases.db_connect import fetch_all, db_cursor
+from databases.aggregates import level_totals
 # ---------------- PAGE ----------------
 st.set_page_config(layout="wide", page_title="UrbanBot AI")
 
@@ -102,22 +103,7 @@ llm = ChatGroq(
 
 # ---------------- DB ----------------
 def sql(query, params=None):
-    conn = mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME"),
-        port=3306
-    )
-
-    cur = conn.cursor()
-    cur.execute(query, params or ())
-
-    rows = cur.fetchall()
-    cols = [c[0] for c in cur.description] if cur.description else []
-
-    conn.close()
-    return rows, cols
+    return fetch_all(query, params)
 
 
 # ---------------- EMAIL ----------------
@@ -166,27 +152,17 @@ def clean_sql(s):
 @st.cache_data
 
 def build_schema_text():
-    conn = mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME"),
-        port=3306
-    )
+    with db_cursor() as cur:
+        cur.execute("SHOW TABLES")
+        tables = [t[0] for t in cur.fetchall()]
 
-    cur = conn.cursor()
+        lines = []
 
-    cur.execute("SHOW TABLES")
-    tables = [t[0] for t in cur.fetchall()]
-
-    lines = []
+        for t in tables:
+            cur.execute(f"SHOW COLUMNS FROM {t}")
+            cols = [c[0] for c in cur.fetchall()]
+            lines.append(f"{t}: {', '.join(cols)}")
 
-    for t in tables:
-        cur.execute(f"SHOW COLUMNS FROM {t}")
-        cols = [c[0] for c in cur.fetchall()]
-        lines.append(f"{t}: {', '.join(cols)}")
-
-    conn.close()
     return "\n".join(lines)  
 
 # ==============================
@@ -308,9 +284,9 @@ def database_agent(question):
     - LIMIT 100
     - Return ONLY SQL
 
-    Date rules:
-    today → DATE(timestamp)=CURDATE()
-    yesterday → DATE(timestamp)=CURDATE()-INTERVAL 1 DAY
+    Date rules (never wrap timestamp in a function):
+    today → timestamp >= CURDATE() AND timestamp < CURDATE()+INTERVAL 1 DAY
+    yesterday → timestamp >= CURDATE()-INTERVAL 1 DAY AND timestamp < CURDATE()
     last week → timestamp >= CURDATE()-INTERVAL 7 DAY
 
     Question:
@@ -334,31 +310,13 @@ def database_agent(question):
     return answer, query, rows
 # ---------------- REPORTS ----------------
 def accident_summary():
-
-    r,_ = sql("SELECT COUNT(*) FROM accident_logs")
-    total = r[0][0]
-
-    rows,_ = sql("""
-        SELECT severity, COUNT(*)
-        FROM accident_logs
-        GROUP BY severity
-    """)
-
-    return total, rows
+    # served from the daily rollup instead of scanning accident_logs
+    return level_totals("accident_logs")
 
 
 def traffic_summary():
-
-    r,_ = sql("SELECT COUNT(*) FROM traffic_logs")
-    total = r[0][0]
-
-    rows,_ = sql("""
-        SELECT congestion_level, COUNT(*)
-        FROM traffic_logs
-        GROUP BY congestion_level
-    """)
-
-    return total, rows
+    # served from the daily rollup instead of scanning traffic_logs
+    return level_totals("traffic_logs")
 
 def complaint_summary():
 
@@ -375,31 +333,13 @@ def complaint_summary():
 
 
 def crowd_summary():
-
-    r,_ = sql("SELECT COUNT(*) FROM crowd_density_logs")
-    total = r[0][0]
-
-    rows,_ = sql("""
-        SELECT density_level, COUNT(*)
-        FROM crowd_density_logs
-        GROUP BY density_level
-    """)
-
-    return total, rows
+    # served from the daily rollup instead of scanning crowd_density_logs
+    return level_totals("crowd_density_logs")
 
 
 def aqi_summary():
-
-    r,_ = sql("SELECT COUNT(*) FROM aqi_logs")
-    total = r[0][0]
-
-    rows,_ = sql("""
-        SELECT aqi_category, COUNT(*)
-        FROM aqi_logs
-        GROUP BY aqi_category
-    """)
-
-    return total, rows
+    # served from the daily rollup instead of scanning aqi_logs
+    return level_totals("aqi_logs")
 
 
 def alerts_summary():
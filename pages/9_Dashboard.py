@@ -1,8 +1,9 @@
 from streamlit_autorefresh import st_autorefresh
 import streamlit as st
 import pandas as pd
-import mysql.connector
-import os
+from datetime import timedelta
+from databases.dashboard_cache import load_table
+from databases.aggregates import today_counts, daily_counts, daily_mean
 
 st_autorefresh(interval=60000, key="datarefresh")  # refresh every 60 sec
 
@@ -10,32 +11,6 @@ st_autorefresh(interval=60000, key="datarefresh")  # refresh every 60 sec
 
 st.set_page_config(layout="wide")
 
-# ---------- DB CONNECT ----------
-
-def get_conn():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME"),
-        port=3306
-    )
-
-# ---------- LOAD DATA ----------
-def load_table(name):
-    conn = get_conn()
-    df = pd.read_sql(f"SELECT * FROM {name}", conn)
-    conn.close()
-    return df
-
-traffic_df = load_table("traffic_logs")
-acc_df = load_table("accident_logs")
-crowd_df = load_table("crowd_density_logs")
-complaints_df = load_table("citizen_complaints")
-alerts_df = load_table("system_alerts")
-aqi_df = load_table("aqi_logs")
-pothole_df = load_table("road_damage_logs")
-
 # ---------- HEADER ----------
 
 st.title("🏙️ Smart City Intelligence Dashboard")
@@ -49,18 +24,14 @@ st.markdown("### 📊 Live City Metrics Overview")
 
 today = pd.Timestamp.today().date()
 
-traffic_today = len(traffic_df[traffic_df.timestamp.dt.date == today])
-accidents_today = len(acc_df[acc_df.timestamp.dt.date == today])
+# counted server-side (see databases/aggregates.py)
+counts = today_counts(today)
 
-crowd_high_count = len(
-    crowd_df[
-        (crowd_df.timestamp.dt.date == today) &
-        (crowd_df.density_level == "High")
-    ]
-)
-
-complaints_today = len(complaints_df[complaints_df.timestamp.dt.date == today])
-alerts_today = len(alerts_df[alerts_df.timestamp.dt.date == today])
+traffic_today = counts["traffic_today"]
+accidents_today = counts["accidents_today"]
+crowd_high_count = counts["crowd_high_count"]
+complaints_today = counts["complaints_today"]
+alerts_today = counts["alerts_today"]
 
 
 
@@ -119,29 +90,18 @@ def panel_start():
 def panel_end():
     st.markdown("</div>", unsafe_allow_html=True)
 
-traffic_daily = (
-    traffic_df
-    .groupby(traffic_df["timestamp"].dt.date)
-    .size()
-)
-
-accident_daily = (
-    acc_df
-    .groupby(acc_df["timestamp"].dt.date)
-    .size()
+trend_days = st.selectbox(
+    "Trend Range",
+    [7, 30, 90, 365],
+    index=2,
+    format_func=lambda d: f"Last {d} days"
 )
+trend_start = today - timedelta(days=trend_days - 1)
 
-complaints_daily = (
-    complaints_df
-    .groupby(complaints_df["timestamp"].dt.date)
-    .size()
-)
-
-aqi_daily = (
-    aqi_df
-    .groupby(aqi_df["timestamp"].dt.date)["aqi"]
-    .mean()
-)
+traffic_daily = daily_counts("traffic_logs", trend_start, today)
+accident_daily = daily_counts("accident_logs", trend_start, today)
+complaints_daily = daily_counts("citizen_complaints", trend_start, today)
+aqi_daily = daily_mean("aqi_logs", "aqi", trend_start, today)
 
 colA, colB,col3 = st.columns(3)
 
@@ -193,6 +153,8 @@ record_type = st.selectbox(
 
 if record_type == "Traffic Records":
 
+    traffic_df = load_table("traffic_logs")
+
     df = traffic_df[[
         "timestamp", "city", "area", "congestion_level"
     ]].copy()
@@ -212,6 +174,8 @@ if record_type == "Traffic Records":
 
 elif record_type == "Crowd Records":
 
+    crowd_df = load_table("crowd_density_logs")
+
     df = crowd_df[[
         "timestamp", "city", "area", "density_level"
     ]].copy()
@@ -224,6 +188,8 @@ elif record_type == "Crowd Records":
 
 elif record_type == "Accident Records":
 
+    acc_df = load_table("accident_logs")
+
     df = acc_df[[
         "timestamp", "city", "area", "severity"
     ]].copy()
@@ -236,6 +202,8 @@ elif record_type == "Accident Records":
     
 elif record_type == "Complaint Records":
 
+    complaints_df = load_table("citizen_complaints")
+
     df = complaints_df[[
         "timestamp","city","area","department","priority"
     ]].copy()
@@ -248,6 +216,8 @@ elif record_type == "Complaint Records":
 
 elif record_type == "Alert Records":
 
+    alerts_df = load_table("system_alerts")
+
     df = alerts_df[[
         "timestamp","location","message","severity"
     ]].copy()
@@ -260,6 +230,8 @@ elif record_type == "Alert Records":
 
 elif record_type == "AQI Records":
 
+    aqi_df = load_table("aqi_logs")
+
     df = aqi_df[[
         "timestamp","city","aqi","aqi_category"
     ]].copy()
@@ -0,0 +1,91 @@
+import gc
+import os
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("cv2")
+
+from utils.crowd_net import (
+    MIN_TILE_MARGIN, RECEPTIVE_FIELD, STRIDE, CrowdNet, image_memory_bytes,
+    predict_tiled, predict_whole, prepare, receptive_field, tile_memory_bytes,
+    tiles_per_batch,
+)
+
+
+@pytest.fixture(scope="module")
+def model():
+    torch.manual_seed(0)
+    return CrowdNet().eval()
+
+
+def _image(h, w, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def test_receptive_field_matches_constant(model):
+    assert receptive_field(model) == (RECEPTIVE_FIELD, STRIDE)
+    assert MIN_TILE_MARGIN % STRIDE == 0
+    assert 2 * MIN_TILE_MARGIN >= RECEPTIVE_FIELD
+
+
+def test_tiled_matches_whole_image(model):
+    x = prepare(_image(256, 320), max_side=0)
+
+    whole = predict_whole(model, x)
+    tiled = predict_tiled(model, x, tile=128, margin=MIN_TILE_MARGIN)
+
+    assert tiled.shape == whole.shape
+    scale = float(np.abs(whole).max())
+    np.testing.assert_allclose(tiled, whole, rtol=0, atol=1e-5 * scale)
+    assert abs(tiled.sum() - whole.sum()) <= 1e-4 * max(abs(whole.sum()), scale)
+
+
+@pytest.mark.parametrize("tile,margin,mem_mb,h,w", [
+    (512, MIN_TILE_MARGIN, 1024, 2048, 2048),
+    (256, MIN_TILE_MARGIN, 512, 1024, 768),
+    (128, 64, 64, 512, 512),
+    (512, MIN_TILE_MARGIN, 16, 2048, 1536),
+])
+def test_tiles_per_batch_respects_budget(tile, margin, mem_mb, h, w):
+    n = tiles_per_batch(tile, margin, mem_mb, h, w)
+    budget = mem_mb * 2**20
+    used = image_memory_bytes(h, w) + tile_memory_bytes(tile, margin, batch=n)
+
+    if n == 1 and used > budget:
+        # a single tile does not fit: it still runs, one at a time
+        return
+    assert used <= budget
+    # and no more tiles would have fit
+    assert image_memory_bytes(h, w) + tile_memory_bytes(tile, margin, batch=n + 1) > budget
+
+
+def _proc_bytes(key):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1]) * 1024
+    raise KeyError(key)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="needs Linux peak-RSS reset")
+def test_tiled_peak_memory_within_budget(model):
+    x = prepare(_image(512, 512), max_side=0)
+    tile, margin = 128, MIN_TILE_MARGIN
+    # room for exactly three tiles per forward pass
+    mem_mb = int((image_memory_bytes(512, 512) + tile_memory_bytes(tile, margin, batch=3)) / 2**20) + 1
+    assert tiles_per_batch(tile, margin, mem_mb, 512, 512) == 3
+
+    predict_tiled(model, x, tile, margin, mem_mb)
+    gc.collect()
+
+    # writing 5 resets VmHWM (peak RSS) to the current RSS
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    base = _proc_bytes("VmRSS")
+    predict_tiled(model, x, tile, margin, mem_mb)
+    peak = _proc_bytes("VmHWM") - base
+
+    assert peak <= mem_mb * 2**20
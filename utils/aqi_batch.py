@@ -0,0 +1,198 @@
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from databases.aqi_db import insert_aqi_logs
+from utils.aqi_models import get_rf
+from utils.city_data import AQI_CITY_COORDS
+from utils.detection_rules import aqi_categories
+
+
+# ---------- bulk scoring config (env) ----------
+CHUNK_ROWS = int(os.getenv("AQI_BATCH_CHUNK_ROWS", "5000"))
+N_JOBS = int(os.getenv("AQI_BATCH_N_JOBS", "-1"))
+
+# the model's feature columns, in order, under their aqi_logs / CSV names
+FEATURES = ["pm25", "pm10", "no", "no2", "nox", "co", "so2", "o3"]
+META = ["timestamp", "city", "monitoring_station", "latitude", "longitude"]
+
+
+def _norm(name):
+    return str(name).strip().lower().replace(".", "").replace("_", "").replace(" ", "")
+
+
+def feature_mapping(columns, model_cols):
+    """
+    Map the model's feature columns to CSV columns, accepting either the
+    model's own names (aqi_calc_columns.pkl) or the aqi_logs names,
+    case / punctuation-insensitive. Raises ValueError listing what is missing.
+    """
+    if len(model_cols) != len(FEATURES):
+        raise ValueError(f"aqi_calc_columns.pkl has {len(model_cols)} columns, expected {len(FEATURES)}")
+
+    by_norm = {_norm(c): c for c in columns}
+    mapping, missing = {}, []
+    for model_col, name in zip(model_cols, FEATURES):
+        found = by_norm.get(_norm(model_col)) or by_norm.get(_norm(name))
+        if found is None:
+            missing.append(f"{model_col} / {name}")
+        else:
+            mapping[model_col] = found
+
+    if missing:
+        raise ValueError(f"CSV is missing AQI feature columns: {', '.join(missing)}")
+    return mapping
+
+
+def _filled(values, default, index):
+    """Metadata column with blank cells replaced by default (left NaN if there is none)."""
+    s = pd.Series(values, index=index, dtype=object)
+    s = s.mask(s.map(lambda v: isinstance(v, str) and not v.strip()))
+    return s.fillna(default) if default is not None else s
+
+
+# ---------- scoring ----------
+def score_chunk(df, city=None, station=None, n_jobs=N_JOBS):
+    """
+    Score one DataFrame of readings → (scored DataFrame, rejected row count).
+    Rows with missing / non-numeric features, or with no city in the row
+    and no default city, are rejected, not guessed. Other missing metadata
+    falls back to station and the city's coordinates.
+    """
+    rf_model, model_cols = get_rf()
+    mapping = feature_mapping(df.columns, model_cols)
+
+    cols = {_norm(c): c for c in df.columns}
+
+    def meta(frame, name, default):
+        col = cols.get(_norm(name))
+        return frame[col].to_numpy() if col is not None else np.full(len(frame), default, dtype=object)
+
+    cities = _filled(meta(df, "city", city), city, df.index)
+    stations = _filled(meta(df, "monitoring_station", station), station, df.index)
+
+    X = pd.DataFrame({
+        model_col: pd.to_numeric(df[csv_col], errors="coerce")
+        for model_col, csv_col in mapping.items()
+    })
+    valid = (X.notna().all(axis=1) & cities.notna()).to_numpy()
+    X, df = X[valid], df[valid]
+
+    out = pd.DataFrame(X.to_numpy(), columns=FEATURES, index=X.index)
+
+    if len(X):
+        # trees release the GIL, so threads share the one mmap'd model
+        workers = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+        parts = np.array_split(np.arange(len(X)), min(workers, len(X)))
+        preds = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(rf_model.predict)(X.iloc[p]) for p in parts
+        )
+        out["aqi"] = np.concatenate(preds)
+    else:
+        out["aqi"] = np.array([], dtype=float)
+
+    out["aqi_category"] = aqi_categories(out["aqi"].to_numpy())
+
+    now = datetime.now()
+    out["timestamp"] = pd.to_datetime(meta(df, "timestamp", now), errors="coerce").fillna(now)
+    out["city"] = cities[valid].to_numpy()
+    out["monitoring_station"] = stations[valid].to_numpy()
+
+    # coordinates default to each row's city
+    coords = pd.DataFrame(
+        [AQI_CITY_COORDS.get(c, (np.nan, np.nan)) for c in out["city"]],
+        columns=["latitude", "longitude"], index=out.index
+    )
+    for col in ("latitude", "longitude"):
+        given = pd.to_numeric(pd.Series(meta(df, col, np.nan), index=out.index), errors="coerce")
+        out[col] = given.fillna(coords[col])
+
+    return out, int((~valid).sum())
+
+
+def to_rows(scored):
+    """aqi_logs insert tuples (see databases.aqi_db.AQI_LOG_INSERT)."""
+    cols = scored[META + ["pm25", "pm10", "co", "no2", "so2", "o3", "aqi", "aqi_category"]]
+    rows = []
+    for r in cols.itertuples(index=False):
+        rows.append((
+            r.timestamp.to_pydatetime(), r.city,
+            None if pd.isna(r.monitoring_station) else r.monitoring_station,
+            None if pd.isna(r.latitude) else float(r.latitude),
+            None if pd.isna(r.longitude) else float(r.longitude),
+            float(r.pm25), float(r.pm10), float(r.co), float(r.no2), float(r.so2), float(r.o3),
+            int(r.aqi), str(r.aqi_category),
+        ))
+    return rows
+
+
+def score_csv(source, city=None, station=None, chunk_rows=CHUNK_ROWS, n_jobs=N_JOBS,
+              store=True, keep=True):
+    """
+    Stream a CSV (path, file object or "-" for stdin) through the model in
+    chunks and bulk-insert each scored chunk into aqi_logs.
+    Returns (scored DataFrame or None if keep=False, stats).
+    """
+    if source == "-":
+        source = sys.stdin
+
+    stats = {"rows": 0, "scored": 0, "rejected": 0, "stored": 0, "store_failed": 0}
+    kept = []
+    start = time.perf_counter()
+    score_secs = 0.0
+
+    for chunk in pd.read_csv(source, chunksize=chunk_rows):
+        stats["rows"] += len(chunk)
+
+        t = time.perf_counter()
+        scored, rejected = score_chunk(chunk, city, station, n_jobs)
+        score_secs += time.perf_counter() - t
+
+        stats["scored"] += len(scored)
+        stats["rejected"] += rejected
+
+        if store and len(scored):
+            if insert_aqi_logs(to_rows(scored)):
+                stats["stored"] += len(scored)
+            else:
+                stats["store_failed"] += len(scored)
+        if keep:
+            kept.append(scored)
+
+    stats["secs"] = round(time.perf_counter() - start, 2)
+    stats["rows_per_sec"] = round(stats["scored"] / score_secs, 1) if score_secs > 0 else 0.0
+
+    result = pd.concat(kept, ignore_index=True) if keep and kept else None
+    return result, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk AQI prediction from a CSV file or stdin")
+    parser.add_argument("source", help="CSV path, or - to read a stream from stdin")
+    parser.add_argument("--city", choices=list(AQI_CITY_COORDS), help="default city for rows without one")
+    parser.add_argument("--station", default=None, help="default monitoring station")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--n-jobs", type=int, default=N_JOBS)
+    parser.add_argument("--dry-run", action="store_true", help="score without inserting into aqi_logs")
+    args = parser.parse_args()
+
+    _, stats = score_csv(
+        args.source, args.city, args.station,
+        chunk_rows=args.chunk_rows, n_jobs=args.n_jobs,
+        store=not args.dry_run, keep=False
+    )
+    print(
+        f"rows: {stats['rows']}  scored: {stats['scored']}  rejected: {stats['rejected']}  "
+        f"stored: {stats['stored']}  failed: {stats['store_failed']}  "
+        f"{stats['rows_per_sec']} rows/sec  ({stats['secs']}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import io
+import os
+import threading
+from datetime import date
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from utils.aqi_models import arima_cities, arima_version, get_arima
+
+
+# the longest horizon the page offers; shorter requests are slices of it
+MAX_HORIZON = int(os.getenv("AQI_FORECAST_HORIZON", "14"))
+
+# city → {"key": (model version, day), "mean": Series, "charts": {days: png}}
+_cache = {}
+_locks = {city: threading.Lock() for city in arima_cities()}
+_stats = {"computed": 0, "hits": 0, "charts_rendered": 0, "chart_hits": 0}
+
+
+def _entry(city):
+    """Cached forecast for city, recomputed when the model or the day changes."""
+    key = (arima_version(city), date.today())
+
+    entry = _cache.get(city)
+    if entry is not None and entry["key"] == key:
+        _stats["hits"] += 1
+        return entry
+
+    # one session computes, concurrent ones wait for its result
+    with _locks[city]:
+        entry = _cache.get(city)
+        if entry is not None and entry["key"] == key:
+            _stats["hits"] += 1
+            return entry
+
+        mean = get_arima(city).get_forecast(steps=MAX_HORIZON).predicted_mean
+        entry = {"key": key, "mean": mean, "charts": {}}
+        _cache[city] = entry
+        _stats["computed"] += 1
+        return entry
+
+
+def forecast(city, days):
+    """Predicted mean AQI for the next `days` (≤ MAX_HORIZON) steps."""
+    if not 1 <= days <= MAX_HORIZON:
+        raise ValueError(f"days must be between 1 and {MAX_HORIZON}")
+    return _entry(city)["mean"].iloc[:days]
+
+
+def forecast_chart(city, days):
+    """PNG of the forecast trend, rendered once per model version, day and horizon."""
+    entry = _entry(city)
+    png = entry["charts"].get(days)
+    if png is not None:
+        _stats["chart_hits"] += 1
+        return png
+
+    mean = forecast(city, days)
+
+    fig, ax = plt.subplots(figsize=(6,3))
+    ax.plot(mean.index, mean.values, marker="o")
+    ax.set_title("AQI Forecast Trend")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("AQI")
+    ax.tick_params(axis="x", rotation=45)
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=110)
+    plt.close(fig)
+
+    png = buf.getvalue()
+    entry["charts"][days] = png
+    _stats["charts_rendered"] += 1
+    return png
+
+
+def forecast_stats():
+    return dict(_stats)
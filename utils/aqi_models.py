@@ -0,0 +1,124 @@
+import argparse
+import os
+import threading
+import time
+
+import joblib
+
+from utils.model_loader import ensure_model
+
+
+# ---------- AQI model files ----------
+RF_PATH = "models/aqi_calculation.pkl"
+COLUMNS_PATH = "models/aqi_calc_columns.pkl"
+
+# city → ARIMA results pickle (the S3 key mirrors the local path)
+ARIMA_PATHS = {
+    "Chennai": "models/chennai_arima.pkl",
+    "Bengaluru": "models/bangalore_arima.pkl",
+    "Delhi": "models/delhi_arima.pkl",
+    "Jaipur": "models/jaipur_arima.pkl",
+}
+
+# memory-map the numpy arrays inside the pickles (tree node tables,
+# ARIMA parameter / data arrays) instead of copying them onto the heap;
+# joblib silently loads compressed pickles normally
+AQI_MMAP = os.getenv("AQI_MMAP", "1") == "1"
+
+# the forest only reads its arrays; statsmodels rebuilds its Cython
+# state-space objects on unpickling and needs writable buffers, so ARIMA
+# pickles are mapped copy-on-write ("r" fails to load them)
+RF_MMAP_MODE = "r"
+ARIMA_MMAP_MODE = "c"
+
+# module globals live once per process, so Streamlit reruns and every
+# session reuse the same unpickled models
+_rf = None
+_arima = {}
+_versions = {}
+_timings = {}
+_rf_lock = threading.Lock()
+_arima_locks = {city: threading.Lock() for city in ARIMA_PATHS}
+
+
+def _load(path, mmap_mode):
+    ensure_model(path, path)
+    mmap_mode = mmap_mode if AQI_MMAP else None
+    start = time.perf_counter()
+    obj = joblib.load(path, mmap_mode=mmap_mode)
+    _timings[path] = {
+        "load_secs": round(time.perf_counter() - start, 3),
+        "file_mb": round(os.path.getsize(path) / 2**20, 1),
+        "mmap": mmap_mode,
+    }
+    return obj
+
+
+def get_rf():
+    """(random-forest model, feature columns), loaded once per process."""
+    global _rf
+
+    if _rf is None:
+        with _rf_lock:
+            if _rf is None:
+                _rf = (_load(RF_PATH, RF_MMAP_MODE), _load(COLUMNS_PATH, RF_MMAP_MODE))
+    return _rf
+
+
+def _file_version(path):
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{path}:{info.st_size}:{info.st_mtime_ns}"
+
+
+def get_arima(city):
+    """
+    ARIMA results for one city, loaded on its first forecast and reloaded
+    when the pickle is rewritten (python -m utils.aqi_update).
+    """
+    path = ARIMA_PATHS[city]
+    model = _arima.get(city)
+    if model is not None and _versions.get(city) == _file_version(path):
+        return model
+
+    with _arima_locks[city]:
+        version = _file_version(path)
+        if city not in _arima or _versions.get(city) != version:
+            _arima[city] = _load(path, ARIMA_MMAP_MODE)
+            _versions[city] = _file_version(path)
+        return _arima[city]
+
+
+def arima_version(city):
+    """Identifier of the ARIMA model currently served for a city (loads it if needed)."""
+    get_arima(city)
+    return _versions[city]
+
+
+def arima_cities():
+    return list(ARIMA_PATHS)
+
+
+def model_timings():
+    """Load time, file size and mmap mode (None = not mapped) per loaded AQI model file."""
+    return {path: dict(t) for path, t in _timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the AQI models and print load timings")
+    parser.add_argument("--cities", default=",".join(ARIMA_PATHS), help="ARIMA models to load")
+    args = parser.parse_args()
+
+    get_rf()
+    for city in args.cities.split(","):
+        if city:
+            get_arima(city)
+
+    for path, t in model_timings().items():
+        print(f"{path}: {t['load_secs']}s  {t['file_mb']} MB  mmap={t['mmap']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from databases.aqi_db import latest_station_readings
+from utils.city_data import AQI_CITY_COORDS
+from utils.detection_rules import aqi_categories
+
+
+# ---------- interpolation config (env) ----------
+GRID_BUCKET_MINS = int(os.getenv("AQI_GRID_BUCKET_MINS", "60"))
+GRID_CELLS = int(os.getenv("AQI_GRID_CELLS", "100"))
+GRID_PAD_KM = float(os.getenv("AQI_GRID_PAD_KM", "5"))
+IDW_POWER = float(os.getenv("AQI_IDW_POWER", "2"))
+IDW_NEIGHBORS = int(os.getenv("AQI_IDW_NEIGHBORS", "8"))
+# stations without a reading in this window are left out of the field
+STATION_MAX_AGE_HOURS = int(os.getenv("AQI_STATION_MAX_AGE_HOURS", "24"))
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON = 111.320
+
+
+class AqiField:
+    """
+    Inverse-distance-weighted AQI surface over one city's stations.
+    Coordinates are projected to local kilometres so the KD-tree's
+    Euclidean neighbours are real nearest stations; each point query is
+    a k-nearest lookup, O(log n) in the number of stations.
+    """
+
+    def __init__(self, stations, values, lats, lons, power=IDW_POWER, neighbors=IDW_NEIGHBORS):
+        if len(values) == 0:
+            raise ValueError("no located station readings to interpolate")
+
+        self.stations = list(stations)
+        self.values = np.asarray(values, dtype="float64")
+        self.lats = np.asarray(lats, dtype="float64")
+        self.lons = np.asarray(lons, dtype="float64")
+        self.power = power
+        self.k = max(1, min(neighbors, len(self.values)))
+
+        self._lat0 = float(self.lats.mean())
+        self._tree = cKDTree(self._project(self.lats, self.lons))
+        self._grid = None
+
+    def _project(self, lats, lons):
+        x = np.asarray(lons) * KM_PER_DEG_LON * math.cos(math.radians(self._lat0))
+        y = np.asarray(lats) * KM_PER_DEG_LAT
+        return np.column_stack([np.ravel(x), np.ravel(y)])
+
+    def query(self, lats, lons):
+        """
+        Vectorized IDW at many points → (aqi array, nearest station km array).
+        A point on a station returns that station's reading.
+        """
+        dist, idx = self._tree.query(self._project(lats, lons), k=self.k)
+        if self.k == 1:
+            dist, idx = dist[:, None], idx[:, None]
+
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / dist ** self.power
+        exact = np.isinf(weights)
+        # an exact hit takes all the weight
+        weights = np.where(exact.any(axis=1, keepdims=True), exact.astype("float64"), weights)
+
+        aqi = (weights * self.values[idx]).sum(axis=1) / weights.sum(axis=1)
+        return aqi, dist[:, 0]
+
+    def at(self, lat, lon):
+        aqi, nearest = self.query([lat], [lon])
+        return {
+            "aqi": round(float(aqi[0]), 1),
+            "aqi_category": str(aqi_categories(aqi)[0]),
+            "nearest_station_km": round(float(nearest[0]), 2),
+            "stations": len(self.values),
+        }
+
+    def grid(self, cells=GRID_CELLS, pad_km=GRID_PAD_KM):
+        """City raster (lats, lons, aqi[cells, cells]) over the padded station extent, built once."""
+        if self._grid is not None and self._grid[2].shape == (cells, cells):
+            return self._grid
+
+        pad_lat = pad_km / KM_PER_DEG_LAT
+        pad_lon = pad_km / (KM_PER_DEG_LON * math.cos(math.radians(self._lat0)))
+        lats = np.linspace(self.lats.min() - pad_lat, self.lats.max() + pad_lat, cells)
+        lons = np.linspace(self.lons.min() - pad_lon, self.lons.max() + pad_lon, cells)
+
+        lat_mesh, lon_mesh = np.meshgrid(lats, lons, indexing="ij")
+        aqi, _ = self.query(lat_mesh.ravel(), lon_mesh.ravel())
+
+        self._grid = (lats, lons, aqi.reshape(cells, cells))
+        return self._grid
+
+
+# ---------- per-city cache by time bucket ----------
+# city → (bucket start, AqiField); rebuilt once per bucket from the newest readings
+_fields = {}
+_locks = {city: threading.Lock() for city in AQI_CITY_COORDS}
+_stats = {"built": 0, "hits": 0, "build_secs_total": 0.0}
+
+
+def time_bucket(now=None, minutes=GRID_BUCKET_MINS):
+    now = now or datetime.now()
+    start = now.replace(second=0, microsecond=0)
+    return start - timedelta(minutes=(start.hour * 60 + start.minute) % minutes)
+
+
+def build_field(city, now=None):
+    now = now or datetime.now()
+    rows = latest_station_readings(city, now - timedelta(hours=STATION_MAX_AGE_HOURS))
+    stations, lats, lons, values, _ = zip(*rows) if rows else ([], [], [], [], [])
+    return AqiField(stations, [float(v) for v in values], [float(v) for v in lats], [float(v) for v in lons])
+
+
+def get_field(city, now=None):
+    """The city's AqiField for the current time bucket, built by one caller."""
+    bucket = time_bucket(now)
+    cached = _fields.get(city)
+    if cached is not None and cached[0] == bucket:
+        _stats["hits"] += 1
+        return cached[1]
+
+    with _locks[city]:
+        cached = _fields.get(city)
+        if cached is not None and cached[0] == bucket:
+            _stats["hits"] += 1
+            return cached[1]
+
+        start = time.perf_counter()
+        field = build_field(city, now)
+        field.grid()
+        _stats["build_secs_total"] += time.perf_counter() - start
+        _stats["built"] += 1
+
+        _fields[city] = (bucket, field)
+        return field
+
+
+def aqi_at(city, lat, lon):
+    """Interpolated AQI at a location from the city's latest station readings."""
+    return get_field(city).at(lat, lon)
+
+
+def spatial_stats():
+    s = dict(_stats)
+    s["build_secs_total"] = round(s["build_secs_total"], 3)
+    s["cached"] = {city: str(bucket) for city, (bucket, _) in _fields.items()}
+    return s
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interpolated AQI from the latest station readings")
+    parser.add_argument("city", choices=list(AQI_CITY_COORDS))
+    parser.add_argument("--point", help="lat,lon to query (default: city centre)")
+    parser.add_argument("--grid-csv", help="write the city raster to this CSV")
+    parser.add_argument("--bench", type=int, default=0, help="time this many random point queries")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    field = get_field(args.city)
+    print(f"{args.city}: {len(field.values)} stations, field + grid built in {time.perf_counter() - start:.3f}s")
+
+    lat, lon = map(float, args.point.split(",")) if args.point else AQI_CITY_COORDS[args.city]
+    print(f"AQI at {lat:.4f},{lon:.4f}: {field.at(lat, lon)}")
+
+    if args.grid_csv:
+        lats, lons, aqi = field.grid()
+        lat_mesh, lon_mesh = np.meshgrid(lats, lons, indexing="ij")
+        np.savetxt(
+            args.grid_csv,
+            np.column_stack([lat_mesh.ravel(), lon_mesh.ravel(), aqi.ravel()]),
+            delimiter=",", header="latitude,longitude,aqi", comments="", fmt="%.6f"
+        )
+        print(f"grid {aqi.shape[0]}x{aqi.shape[1]} written to {args.grid_csv}")
+
+    if args.bench:
+        lats, lons, _ = field.grid()
+        rng = np.random.default_rng(0)
+        q_lat = rng.uniform(lats[0], lats[-1], args.bench)
+        q_lon = rng.uniform(lons[0], lons[-1], args.bench)
+
+        start = time.perf_counter()
+        for a, b in zip(q_lat, q_lon):
+            field.at(a, b)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        field.query(q_lat, q_lon)
+        batched = time.perf_counter() - start
+
+        print(
+            f"{args.bench} point queries: {args.bench / single:.0f}/sec one at a time, "
+            f"{args.bench / batched:.0f}/sec vectorized"
+        )
+
+
+if __name__ == "__main__":
+    main()
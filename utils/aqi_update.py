@@ -0,0 +1,128 @@
+import argparse
+import os
+import time
+from datetime import date, timedelta
+
+import joblib
+import pandas as pd
+
+from databases.aggregates import daily_mean
+from utils.aqi_models import ARIMA_PATHS, arima_cities, get_arima
+from utils.model_loader import publish_model
+
+
+# ---------- online ARIMA update config (env) ----------
+# "append" keeps the whole history in the pickle, "extend" keeps only the
+# state and the new days (smaller files, same forecasts)
+AQI_UPDATE_MODE = os.getenv("AQI_UPDATE_MODE", "append")
+
+
+def _last_day(results):
+    index = results.fittedvalues.index
+    if not isinstance(index, pd.DatetimeIndex):
+        raise ValueError("ARIMA model has no date index; cannot match daily AQI means to it")
+    return index[-1].date()
+
+
+def new_observations(city, results, until=None):
+    """
+    Daily mean AQI for city after the model's last day up to `until`
+    (default yesterday, today is still filling up), one row per day.
+    Days without readings stay NaN — the Kalman filter skips them —
+    and trailing empty days are dropped so the state ends on real data.
+    """
+    start = _last_day(results) + timedelta(days=1)
+    until = until or date.today() - timedelta(days=1)
+    if start > until:
+        return pd.Series(dtype="float64")
+
+    means = daily_mean("aqi_logs", "aqi", start, until, city=city)
+    if means.dropna().empty:
+        return pd.Series(dtype="float64")
+
+    means.index = pd.to_datetime(means.index)
+    freq = results.fittedvalues.index.freq or "D"
+    index = pd.date_range(start, means.dropna().index[-1], freq=freq)
+    return means.reindex(index).astype("float64")
+
+
+def update_results(results, new, mode=AQI_UPDATE_MODE):
+    """New results with `new` filtered into the state, parameters unchanged."""
+    if mode == "extend":
+        return results.extend(new)
+    return results.append(new, refit=False)
+
+
+def refit(results):
+    """Full refit of the same specification on the updated history (benchmark)."""
+    endog = results.model.data.orig_endog
+    return results.model.clone(endog).fit()
+
+
+def save(results, path, upload=True):
+    """Write the pickle atomically, then publish it under the same key."""
+    tmp = f"{path}.tmp"
+    joblib.dump(results, tmp)
+    os.replace(tmp, path)
+    if upload:
+        publish_model(path, path)
+
+
+# ---------- update job ----------
+def update_city(city, dry_run=False, upload=True, bench=False, mode=AQI_UPDATE_MODE):
+    """Append the city's new daily means to its ARIMA state → stats dict."""
+    results = get_arima(city)
+    new = new_observations(city, results)
+    stats = {"city": city, "new_days": len(new), "observed_days": int(new.notna().sum())}
+    if new.empty:
+        return stats
+
+    start = time.perf_counter()
+    updated = update_results(results, new, mode)
+    stats["update_ms"] = round(1000 * (time.perf_counter() - start), 1)
+    stats["last_day"] = str(_last_day(updated))
+
+    if bench:
+        # refit on the appended history, whichever mode is used for saving
+        full = updated if mode == "append" else results.append(new, refit=False)
+        start = time.perf_counter()
+        refit(full)
+        stats["refit_ms"] = round(1000 * (time.perf_counter() - start), 1)
+        stats["speedup"] = round(stats["refit_ms"] / max(stats["update_ms"], 0.001), 1)
+
+    if not dry_run:
+        save(updated, ARIMA_PATHS[city], upload)
+        stats["saved"] = True
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the ARIMA models with newly logged daily AQI means")
+    parser.add_argument("--cities", default=",".join(arima_cities()), help="comma-separated cities")
+    parser.add_argument("--mode", default=AQI_UPDATE_MODE, choices=["append", "extend"])
+    parser.add_argument("--bench", action="store_true", help="also time a full refit for comparison")
+    parser.add_argument("--dry-run", action="store_true", help="update in memory only, do not save")
+    parser.add_argument("--no-upload", action="store_true", help="save locally without publishing to S3")
+    args = parser.parse_args()
+
+    for city in args.cities.split(","):
+        if not city:
+            continue
+        s = update_city(
+            city, dry_run=args.dry_run, upload=not args.no_upload,
+            bench=args.bench, mode=args.mode
+        )
+        if not s["new_days"]:
+            print(f"{city}: up to date")
+            continue
+
+        line = f"{city}: +{s['new_days']} days ({s['observed_days']} observed) → {s['last_day']}  update {s['update_ms']} ms"
+        if "refit_ms" in s:
+            line += f"  refit {s['refit_ms']} ms  ({s['speedup']}x)"
+        if s.get("saved"):
+            line += "  saved"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+# ---------- micro-batching config (env) ----------
+# a batch runs as soon as it has this many requests ...
+BATCH_MAX = int(os.getenv("INFERENCE_BATCH_MAX", "8"))
+# ... or its oldest request has waited this long
+BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "10"))
+
+
+def _depth_bucket(n):
+    """Power-of-two buckets: 1, 2, 3-4, 5-8, 9-16 ..."""
+    if n <= 2:
+        return str(n)
+    hi = 1 << (n - 1).bit_length()
+    return f"{hi // 2 + 1}-{hi}"
+
+
+def _new_stats():
+    return {
+        "batches": 0,
+        "items": 0,
+        "wait_ms_total": 0.0,
+        "batch_size": {},
+        "queue_depth": {},
+    }
+
+
+def merge_stats(snapshots):
+    """Add up stats() dicts, e.g. from several worker processes."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, s in snapshot.items():
+            m = merged.setdefault(name, _new_stats())
+            m["batches"] += s["batches"]
+            m["items"] += s["items"]
+            m["wait_ms_total"] += s["wait_ms_total"]
+            for hist in ("batch_size", "queue_depth"):
+                for bucket, n in s[hist].items():
+                    m[hist][bucket] = m[hist].get(bucket, 0) + n
+    for m in merged.values():
+        m["mean_batch"] = round(m["items"] / m["batches"], 2) if m["batches"] else 0.0
+        m["mean_wait_ms"] = round(m["wait_ms_total"] / m["items"], 2) if m["items"] else 0.0
+    return merged
+
+
+class MicroBatcher:
+    """
+    Collects requests per key (model + settings) for up to max_wait_ms or
+    max_batch items, runs them as one call and scatters the results back
+    to each caller's Future.
+    run(key, items) → list of results, one per item, in order
+    """
+
+    def __init__(self, run, max_batch=BATCH_MAX, max_wait_ms=BATCH_WAIT_MS, on_batch=None):
+        self.run = run
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.on_batch = on_batch
+
+        self._queues = {}
+        self._threads = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {}
+
+    @staticmethod
+    def _label(key):
+        return key[0] if isinstance(key, tuple) else str(key)
+
+    def submit(self, key, item):
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("batcher is closed")
+            self._queues.setdefault(key, deque()).append((item, future, time.monotonic()))
+            if key not in self._threads:
+                thread = threading.Thread(target=self._loop, args=(key,), name=f"batch-{self._label(key)}", daemon=True)
+                self._threads[key] = thread
+                thread.start()
+            self._cond.notify_all()
+        return future
+
+    def _take(self, key):
+        """Block until a batch for key is due → list of (item, future, queued_at)."""
+        q = self._queues[key]
+        with self._cond:
+            while not q and not self._closed:
+                self._cond.wait()
+            if not q:
+                return []
+
+            # the oldest request waits at most max_wait for company
+            deadline = q[0][2] + self.max_wait
+            while len(q) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            depth = len(q)
+            batch = [q.popleft() for _ in range(min(depth, self.max_batch))]
+
+            now = time.monotonic()
+            s = self._stats.setdefault(self._label(key), _new_stats())
+            s["batches"] += 1
+            s["items"] += len(batch)
+            s["wait_ms_total"] += sum(1000 * (now - queued) for _, _, queued in batch)
+            size = str(len(batch))
+            s["batch_size"][size] = s["batch_size"].get(size, 0) + 1
+            bucket = _depth_bucket(depth)
+            s["queue_depth"][bucket] = s["queue_depth"].get(bucket, 0) + 1
+            return batch
+
+    def _loop(self, key):
+        while True:
+            batch = self._take(key)
+            if not batch:
+                return
+
+            try:
+                results = self.run(key, [item for item, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+
+            if self.on_batch:
+                self.on_batch()
+
+    def pending(self):
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def close(self):
+        """Run what is queued, then stop the batch threads."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in list(self._threads.values()):
+            thread.join(timeout=5)
+
+    def stats(self):
+        """Per model: batches, items, mean batch / wait and the two histograms."""
+        with self._cond:
+            snapshot = {
+                name: {**s, "batch_size": dict(s["batch_size"]), "queue_depth": dict(s["queue_depth"])}
+                for name, s in self._stats.items()
+            }
+        return merge_stats([snapshot])
@@ -0,0 +1,32 @@
+# ---------- monitored cities → areas → (lat, lon) ----------
+CITY_AREA_DATA = {
+    "Chennai": {
+        "T Nagar": (13.0418, 80.2337),
+        "Anna Nagar": (13.0850, 80.2101)
+    },
+    "Coimbatore": {
+        "Gandhipuram": (11.0183, 76.9725),
+        "RS Puram": (11.0089, 76.9510)
+    },
+    "Madurai": {
+        "Anna Nagar": (9.9391, 78.1384),
+        "KK Nagar": (9.9173, 78.1192)
+    },
+    "Tiruchirappalli": {
+        "Srirangam": (10.8623, 78.6932),
+        "Thillai Nagar": (10.8186, 78.6828)
+    },
+    "Salem": {
+        "Fairlands": (11.6643, 78.1460),
+        "Hasthampatti": (11.6710, 78.1348)
+    }
+}
+
+
+# ---------- AQI cities → default monitoring coordinates ----------
+AQI_CITY_COORDS = {
+    "Chennai": (13.0827, 80.2707),
+    "Bengaluru": (12.9716, 77.5946),
+    "Delhi": (28.6139, 77.2090),
+    "Jaipur": (26.9124, 75.7873)
+}
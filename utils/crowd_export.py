@@ -0,0 +1,171 @@
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+import torch
+
+from utils.crowd_net import CROWD_WEIGHTS, load_crowd, predict_density
+from utils.model_loader import ensure_model
+from utils.model_registry import rss_bytes
+
+
+ONNX_OPSET = 17
+
+
+# ---------- export ----------
+def export_torchscript(model, path=CROWD_WEIGHTS["torchscript"]):
+    example = torch.zeros(1, 3, 256, 256)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example)
+    traced = torch.jit.freeze(traced)
+    traced.save(path)
+    return path
+
+
+def export_onnx(model, path=CROWD_WEIGHTS["onnx"]):
+    """fp32 ONNX graph with dynamic batch / height / width."""
+    example = torch.zeros(1, 3, 256, 256)
+    torch.onnx.export(
+        model, example, path,
+        input_names=["image"],
+        output_names=["density"],
+        dynamic_axes={
+            "image": {0: "batch", 2: "height", 3: "width"},
+            "density": {0: "batch", 2: "height_8", 3: "width_8"},
+        },
+        opset_version=ONNX_OPSET,
+    )
+    return path
+
+
+def quantize_int8(src=CROWD_WEIGHTS["onnx"], path=CROWD_WEIGHTS["onnx-int8"]):
+    """Dynamic int8 quantization of the fp32 ONNX weights (activations stay fp32)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(src, path, weight_type=QuantType.QUInt8)
+    return path
+
+
+def export_all(int8=True):
+    """Export the eager .pth weights to every other backend → {backend: path}."""
+    src = CROWD_WEIGHTS["torch"]
+    ensure_model(src, src)
+    model = load_crowd("torch")
+
+    out = {
+        "torchscript": export_torchscript(model),
+        "onnx": export_onnx(model),
+    }
+    if int8:
+        out["onnx-int8"] = quantize_int8()
+    return out
+
+
+# ---------- benchmark ----------
+def load_images(paths):
+    images = []
+    for path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            print(f"Skipping unreadable image: {path}")
+            continue
+        images.append((path, img))
+    return images
+
+
+def benchmark(images, backends=None, runs=3):
+    """
+    Latency, memory and count error per backend on a fixed image set.
+    Counts are compared with the eager fp32 model.
+    Returns a list of row dicts.
+    """
+    backends = backends or [b for b in CROWD_WEIGHTS if os.path.exists(CROWD_WEIGHTS[b])]
+    reference = None
+    rows = []
+
+    for backend in backends:
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        model = load_crowd(backend)
+        load_secs = time.perf_counter() - start
+
+        # warm-up run (ONNX Runtime and TorchScript optimise on first call)
+        predict_density(model, images[0][1])
+
+        timings, counts = [], []
+        for _ in range(runs):
+            counts = []
+            for _, img in images:
+                start = time.perf_counter()
+                count, _ = predict_density(model, img)
+                timings.append(time.perf_counter() - start)
+                counts.append(count)
+
+        rss_after = rss_bytes()
+        counts = np.array(counts)
+        if reference is None and backend == "torch":
+            reference = counts
+
+        rows.append({
+            "backend": backend,
+            "load_secs": round(load_secs, 2),
+            "ms_mean": round(1000 * float(np.mean(timings)), 1),
+            "ms_p95": round(1000 * float(np.percentile(timings, 95)), 1),
+            "rss_mb": (
+                round((rss_after - rss_before) / 2**20, 1)
+                if rss_before is not None and rss_after is not None
+                else None
+            ),
+            "file_mb": round(os.path.getsize(CROWD_WEIGHTS[backend]) / 2**20, 1),
+            "count_err": (
+                round(float(np.mean(np.abs(counts - reference) / np.maximum(reference, 1))), 4)
+                if reference is not None else None
+            ),
+        })
+        del model
+
+    return rows
+
+
+def print_table(rows):
+    cols = ["backend", "load_secs", "ms_mean", "ms_p95", "rss_mb", "file_mb", "count_err"]
+    print("  ".join(f"{c:>11}" for c in cols))
+    for row in rows:
+        print("  ".join(f"{str(row[c]):>11}" for c in cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export CrowdNet to TorchScript / ONNX and benchmark the backends")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_export = sub.add_parser("export", help="write .ts, .onnx and .int8.onnx next to the .pth")
+    p_export.add_argument("--no-int8", action="store_true")
+
+    p_bench = sub.add_parser("bench", help="compare backends on a fixed image set")
+    p_bench.add_argument("images", nargs="+")
+    p_bench.add_argument("--backends", default=None, help="comma-separated, default: every exported backend")
+    p_bench.add_argument("--runs", type=int, default=3)
+
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        for backend, path in export_all(int8=not args.no_int8).items():
+            print(f"{backend}: {path}")
+        return
+
+    images = load_images(args.images)
+    if not images:
+        parser.error("no readable images")
+
+    backends = args.backends.split(",") if args.backends else None
+    # eager fp32 goes first so the others have a reference count
+    if backends and "torch" in backends:
+        backends.remove("torch")
+        backends.insert(0, "torch")
+    print_table(benchmark(images, backends, args.runs))
+
+
+if __name__ == "__main__":
+    main()
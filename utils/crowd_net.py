@@ -0,0 +1,258 @@
+import argparse
+import os
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+from torchvision import models
+
+
+# output map is 1/8 of the input (three max-pools in the VGG frontend)
+STRIDE = 8
+# input pixels one output value depends on: VGG16 conv1_1–conv4_3 (92)
+# plus four dilated 3x3 convs at stride 8 (4 x 32); see receptive_field()
+RECEPTIVE_FIELD = 220
+# context a tile needs on every side for its core to match the whole-image
+# map exactly: half the receptive field, rounded up to the stride
+MIN_TILE_MARGIN = -(-(RECEPTIVE_FIELD // 2) // STRIDE) * STRIDE
+
+# ---------- tiled inference config (env) ----------
+# larger inputs are downscaled so the longest side is at most this
+MAX_SIDE = int(os.getenv("CROWD_MAX_SIDE", "2048"))
+# core tile edge and context margin added on every side (multiples of 8);
+# margins below MIN_TILE_MARGIN trade small seam differences for speed
+TILE = int(os.getenv("CROWD_TILE", "512"))
+TILE_MARGIN = int(os.getenv("CROWD_TILE_MARGIN", str(MIN_TILE_MARGIN)))
+# memory budget per tiled call (image tensors + batched tile activations);
+# sets how many tiles run together — a budget, not a hard ceiling
+TILE_MEM_MB = int(os.getenv("CROWD_TILE_MEM_MB", "1024"))
+
+# fp32 values per pixel of a tile alive at the peak of a forward pass:
+# the 3-channel input batch plus conv1_2's 64-channel input and output,
+# each held twice while oneDNN converts between plain and blocked layouts
+# (measured; every later layer works on 1/4 of the area or less)
+PEAK_CHANNELS = 3 + 4 * 64
+
+# ---------- inference backends ----------
+# backend → weights file; the exported files come from utils.crowd_export
+CROWD_WEIGHTS = {
+    "torch": "models/crowd_density_cc50_v1.pth",
+    "torchscript": "models/crowd_density_cc50_v1.ts",
+    "onnx": "models/crowd_density_cc50_v1.onnx",
+    "onnx-int8": "models/crowd_density_cc50_v1.int8.onnx",
+}
+CROWD_BACKEND = os.getenv("CROWD_BACKEND", "torch")
+
+
+# ---------- CrowdNet (VGG16 frontend + dilated backend) ----------
+class CrowdNet(nn.Module):
+    def __init__(self):
+        super().__init__()
+        vgg = models.vgg16(weights=None)
+        self.frontend = nn.Sequential(*list(vgg.features.children())[:23])
+        self.backend = nn.Sequential(
+            nn.Conv2d(512,512,3,padding=2,dilation=2), nn.ReLU(),
+            nn.Conv2d(512,256,3,padding=2,dilation=2), nn.ReLU(),
+            nn.Conv2d(256,128,3,padding=2,dilation=2), nn.ReLU(),
+            nn.Conv2d(128,64,3,padding=2,dilation=2), nn.ReLU(),
+        )
+        self.output_layer = nn.Conv2d(64,1,1)
+
+    def forward(self,x):
+        return self.output_layer(self.backend(self.frontend(x)))
+
+
+class OnnxCrowdNet:
+    """
+    ONNX Runtime session with the same call signature as CrowdNet
+    (torch tensor in, torch tensor out), so the tiling code works
+    unchanged for every backend.
+    """
+
+    def __init__(self, path):
+        import onnxruntime as ort
+
+        self.path = path
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, x):
+        out = self.session.run(None, {self.input_name: x.numpy()})[0]
+        return torch.from_numpy(out)
+
+    def eval(self):
+        return self
+
+
+def load_crowd(backend=CROWD_BACKEND, path=None):
+    """
+    Load CrowdNet for one backend: torch / torchscript / onnx / onnx-int8.
+    path defaults to CROWD_WEIGHTS[backend].
+    """
+    if backend not in CROWD_WEIGHTS:
+        raise ValueError(f"Unknown crowd backend: {backend} (expected one of {list(CROWD_WEIGHTS)})")
+    path = path or CROWD_WEIGHTS[backend]
+
+    if backend == "torch":
+        model = CrowdNet()
+        model.load_state_dict(torch.load(path, map_location="cpu"))
+        return model.eval()
+    if backend == "torchscript":
+        return torch.jit.load(path, map_location="cpu").eval()
+    return OnnxCrowdNet(path)
+
+
+# ---------- preprocessing ----------
+def prepare(img, max_side=MAX_SIDE):
+    """
+    BGR uint8 image → (1,3,H,W) float tensor with H, W multiples of 8,
+    downscaled first if the longest side exceeds max_side.
+    """
+    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    h, w = rgb.shape[:2]
+
+    if max_side and max(h, w) > max_side:
+        scale = max_side / max(h, w)
+        w, h = int(w * scale), int(h * scale)
+        rgb = cv2.resize(rgb, (w, h), interpolation=cv2.INTER_AREA)
+
+    rgb = cv2.resize(rgb, (w - w % STRIDE, h - h % STRIDE))
+    # same scaling as torchvision's ToTensor
+    return torch.from_numpy(rgb).permute(2, 0, 1).float().div(255).unsqueeze(0)
+
+
+def receptive_field(model):
+    """(receptive field, stride) in input pixels of a CrowdNet, from its layers."""
+    r, j = 1, 1
+    for layer in [*model.frontend, *model.backend, model.output_layer]:
+        if isinstance(layer, nn.Conv2d):
+            r += (layer.kernel_size[0] - 1) * layer.dilation[0] * j
+            j *= layer.stride[0]
+        elif isinstance(layer, nn.MaxPool2d):
+            r += (layer.kernel_size - 1) * j
+            j *= layer.stride
+    return r, j
+
+
+def tile_memory_bytes(tile=TILE, margin=TILE_MARGIN, batch=1):
+    """
+    Peak tensor memory of one batched tile forward pass (fp32): the
+    PEAK_CHANNELS values per tile pixel plus the tiles' output maps.
+    Model weights are loaded once per process and not included.
+    """
+    side = tile + 2 * margin
+    return batch * 4 * (side * side * PEAK_CHANNELS + (side // STRIDE) ** 2)
+
+
+def image_memory_bytes(h, w):
+    """Held for a whole tiled call: the prepared (1,3,H,W) tensor and the stitched map."""
+    return 4 * (3 * h * w + (h // STRIDE) * (w // STRIDE))
+
+
+def tiles_per_batch(tile=TILE, margin=TILE_MARGIN, mem_mb=TILE_MEM_MB, h=0, w=0):
+    """
+    Tiles per forward pass so an (h, w) image's tensors plus one batch
+    fit in mem_mb. Always at least 1, so a budget smaller than a single
+    tile is exceeded rather than failing.
+    """
+    budget = mem_mb * 2**20 - image_memory_bytes(h, w)
+    return max(1, int(budget // tile_memory_bytes(tile, margin)))
+
+
+# ---------- inference ----------
+def predict_whole(model, x):
+    with torch.no_grad():
+        return model(x)[0, 0].numpy()
+
+
+def predict_tiled(model, x, tile=TILE, margin=TILE_MARGIN, mem_mb=TILE_MEM_MB):
+    """
+    Density map for x (1,3,H,W) computed tile by tile.
+    Each tile is run with `margin` pixels of context on every side and
+    only its core is kept, so nothing is counted twice; with margin >=
+    MIN_TILE_MARGIN the stitched map equals the whole-image map (up to
+    float rounding). Tiles of equal shape run together, as many per
+    forward pass as fit in mem_mb.
+    """
+    _, _, h, w = x.shape
+    out = np.zeros((h // STRIDE, w // STRIDE), dtype=np.float32)
+
+    # group tiles by their input shape so they can be stacked
+    groups = {}
+    for y0 in range(0, h, tile):
+        for x0 in range(0, w, tile):
+            y1, x1 = min(y0 + tile, h), min(x0 + tile, w)
+            iy0, ix0 = max(y0 - margin, 0), max(x0 - margin, 0)
+            iy1, ix1 = min(y1 + margin, h), min(x1 + margin, w)
+            groups.setdefault((iy1 - iy0, ix1 - ix0), []).append(
+                (y0, x0, y1, x1, iy0, ix0, iy1, ix1)
+            )
+
+    per_batch = tiles_per_batch(tile, margin, mem_mb, h, w)
+
+    with torch.no_grad():
+        for specs in groups.values():
+            for i in range(0, len(specs), per_batch):
+                chunk = specs[i:i + per_batch]
+                batch = torch.cat([x[:, :, iy0:iy1, ix0:ix1] for *_, iy0, ix0, iy1, ix1 in chunk])
+                dmaps = model(batch)[:, 0].numpy()
+
+                for (y0, x0, y1, x1, iy0, ix0, _, _), d in zip(chunk, dmaps):
+                    oy, ox = (y0 - iy0) // STRIDE, (x0 - ix0) // STRIDE
+                    th, tw = (y1 - y0) // STRIDE, (x1 - x0) // STRIDE
+                    out[y0 // STRIDE:y0 // STRIDE + th, x0 // STRIDE:x0 // STRIDE + tw] = \
+                        d[oy:oy + th, ox:ox + tw]
+
+    return out
+
+
+def predict_density(model, img, max_side=MAX_SIDE, tile=TILE, margin=TILE_MARGIN,
+                    mem_mb=TILE_MEM_MB):
+    """
+    (count, density map) for a BGR image. Images that fit in one tile
+    (core + margins) run whole; larger ones are tiled.
+    """
+    x = prepare(img, max_side)
+    if max(x.shape[2:]) <= tile + 2 * margin:
+        dmap = predict_whole(model, x)
+    else:
+        dmap = predict_tiled(model, x, tile, margin, mem_mb)
+    return float(dmap.sum()), dmap
+
+
+def tile_parity(model, img, tile=256, margin=TILE_MARGIN):
+    """
+    Compare tiled and whole-image counts on a (small) image.
+    Returns (whole count, tiled count, relative error).
+    """
+    x = prepare(img, max_side=0)
+    whole = float(predict_whole(model, x).sum())
+    tiled = float(predict_tiled(model, x, tile, margin).sum())
+    return whole, tiled, abs(tiled - whole) / max(abs(whole), 1e-6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check tiled CrowdNet inference against whole-image inference")
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--tile", type=int, default=256)
+    parser.add_argument("--margin", type=int, default=TILE_MARGIN)
+    parser.add_argument("--tolerance", type=float, default=0.02, help="max relative count error")
+    args = parser.parse_args()
+
+    from utils.model_registry import get_model
+
+    model = get_model("crowd")
+    worst = 0.0
+
+    for path in args.images:
+        whole, tiled, err = tile_parity(model, cv2.imread(path), args.tile, args.margin)
+        worst = max(worst, err)
+        print(f"{path}: whole {whole:.1f}  tiled {tiled:.1f}  error {err:.2%}")
+
+    print(f"worst error {worst:.2%} (tolerance {args.tolerance:.0%})")
+    raise SystemExit(0 if worst <= args.tolerance else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import numpy as np
+
+
+# ---------- rules shared by the pages, batch and stream paths ----------
+def congestion_level(count):
+    if count < 10:
+        return "low"
+    elif count < 25:
+        return "medium"
+    return "high"
+
+
+def is_peak_hour(ts):
+    h = ts.hour
+    return (8 <= h <= 11) or (17 <= h <= 20)
+
+
+def accident_severity(confidence_max):
+    if confidence_max >= 0.80:
+        return "high"
+    elif confidence_max >= 0.50:
+        return "medium"
+    return "low"
+
+
+# ---------- AQI ----------
+# inclusive upper bound of every category but the last
+AQI_BINS = [50, 200, 400]
+AQI_CATEGORIES = ["Good", "Moderate", "Poor", "Severe"]
+
+
+def aqi_category(aqi):
+    for bound, cat in zip(AQI_BINS, AQI_CATEGORIES):
+        if aqi <= bound:
+            return cat
+    return AQI_CATEGORIES[-1]
+
+
+def aqi_categories(values):
+    """Vectorized aqi_category over an array of AQI values."""
+    return np.array(AQI_CATEGORIES)[np.searchsorted(AQI_BINS, values, side="left")]
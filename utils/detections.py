@@ -0,0 +1,31 @@
+import cv2
+
+
+def to_detections(result):
+    """
+    Plain, JSON-serializable form of one ultralytics result:
+    {"boxes": [[x1, y1, x2, y2]], "conf": [...], "cls": [...], "names": [...]}
+    Box coordinates are in the pixels of the image that was inferred.
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return {"boxes": [], "conf": [], "cls": [], "names": []}
+
+    cls = boxes.cls.int().tolist()
+    return {
+        "boxes": [[round(v, 1) for v in box] for box in boxes.xyxy.tolist()],
+        "conf": [round(c, 4) for c in boxes.conf.tolist()],
+        "cls": cls,
+        "names": [result.names[c] for c in cls],
+    }
+
+
+def draw_boxes(img, detections, color, labels=False):
+    """Draw detections onto img in place and return it."""
+    for i, (x1, y1, x2, y2) in enumerate(detections["boxes"]):
+        cv2.rectangle(img, (int(x1), int(y1)), (int(x2), int(y2)), color, 3)
+        if labels:
+            text = f"{detections['names'][i]} {detections['conf'][i]:.2f}"
+            cv2.putText(img, text, (int(x1), max(int(y1) - 6, 12)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    return img
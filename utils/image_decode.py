@@ -0,0 +1,98 @@
+import os
+import struct
+
+import cv2
+import numpy as np
+
+
+# decode at 1/2, 1/4 or 1/8 size when the image is this many times larger
+# than needed; JPEG scales in the DCT, so skipped pixels are never decoded
+DECODE_REDUCED = os.getenv("DECODE_REDUCED", "1") == "1"
+
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# JPEG start-of-frame markers (baseline, progressive, lossless ...)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+# ---------- header parsing ----------
+def _jpeg_size(data):
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in _SOF_MARKERS:
+            h, w = struct.unpack(">HH", data[i + 5:i + 9])
+            return w, h
+        if marker == 0xFF:
+            i += 1
+        elif marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            i += 2
+        else:
+            i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+
+def image_size(data):
+    """
+    (width, height) read from a JPEG / PNG / WebP header without
+    decoding the pixels, or None for other formats.
+    """
+    if data[:2] == b"\xff\xd8":
+        return _jpeg_size(data)
+
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            w, h = struct.unpack("<HH", data[26:30])
+            return w & 0x3FFF, h & 0x3FFF
+        if chunk == b"VP8L":
+            b = data[21:25]
+            w = 1 + (((b[1] & 0x3F) << 8) | b[0])
+            h = 1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6))
+            return w, h
+        if chunk == b"VP8X":
+            w = 1 + int.from_bytes(data[24:27], "little")
+            h = 1 + int.from_bytes(data[27:30], "little")
+            return w, h
+
+    return None
+
+
+# ---------- decoding ----------
+def reduce_factor(size, target):
+    """Largest of 8/4/2 that keeps the longest side >= target (1 if none)."""
+    if size is None or not target:
+        return 1
+    longest = max(size)
+    for factor, _ in _REDUCED_FLAGS:
+        if longest // factor >= target:
+            return factor
+    return 1
+
+
+def decode_image(data, target=None):
+    """
+    Decode encoded image bytes to BGR.
+    target → longest side the consumer actually uses (e.g. the model imgsz);
+    much larger images are decoded at a reduced size.
+    Returns None if the bytes are not an image.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+
+    factor = reduce_factor(image_size(data), target) if DECODE_REDUCED else 1
+    if factor > 1:
+        img = cv2.imdecode(buf, dict(_REDUCED_FLAGS)[factor])
+        if img is not None:
+            return img
+
+    return cv2.imdecode(buf, cv2.IMREAD_COLOR)
@@ -0,0 +1,146 @@
+import argparse
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from utils.batch_scheduler import MicroBatcher
+from utils.crowd_net import MAX_SIDE
+from utils.inference_config import inference_settings, predict_kwargs
+from utils.inference_service import (
+    InferenceError, InferencePool, InferenceTimeout, batch_key, run_requests
+)
+
+
+# ---------- client config (env) ----------
+# pool → models live in the worker processes of utils.inference_service
+# inline → run in this process, concurrent sessions micro-batched
+#          through the cached model instances
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "pool")
+TIMEOUT_SECS = float(os.getenv("INFERENCE_TIMEOUT_SECS", "30"))
+
+
+# one pool (or in-process batcher) per process, shared by every Streamlit session
+_pool = None
+_batcher = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = InferencePool()
+                atexit.register(_pool.close)
+    return _pool
+
+
+def get_batcher():
+    global _batcher
+
+    if _batcher is None:
+        with _pool_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(run_requests)
+                atexit.register(_batcher.close)
+    return _batcher
+
+
+def _infer_inline(model_name, data, target, kwargs, timeout):
+    request = {
+        "id": 0, "model": model_name, "data": data, "target": target,
+        "kwargs": kwargs or {}, "deadline": time.time() + timeout if timeout else None,
+    }
+    future = get_batcher().submit(batch_key(request), request)
+    try:
+        ok, result = future.result(timeout=timeout)
+    except FutureTimeout:
+        raise InferenceTimeout(f"{model_name} inference took longer than {timeout}s")
+    if not ok:
+        raise InferenceTimeout(result) if result == "timeout" else InferenceError(result)
+    return result
+
+
+def infer(model_name, data, target=None, kwargs=None, timeout=TIMEOUT_SECS):
+    """
+    Run one model on encoded image bytes and return its result dict.
+    Raises InferenceTimeout when no answer arrives within timeout seconds
+    and InferenceError when the worker failed.
+    """
+    if INFERENCE_MODE == "inline":
+        return _infer_inline(model_name, data, target, kwargs, timeout)
+
+    pool = get_pool()
+    future = pool.submit(model_name, data, target, kwargs, timeout)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        pool.forget(future)
+        raise InferenceTimeout(f"{model_name} inference took longer than {timeout}s")
+
+
+def detect(model_name, data, timeout=TIMEOUT_SECS):
+    """
+    YOLO detections (see utils.detections) for uploaded image bytes, with
+    box coordinates in the image that decode_image(data, imgsz) returns.
+    """
+    imgsz = inference_settings(model_name)["imgsz"]
+    return infer(model_name, data, imgsz, predict_kwargs(model_name), timeout)["detections"]
+
+
+def crowd_count(data, timeout=TIMEOUT_SECS):
+    """Estimated head count for uploaded image bytes."""
+    return infer("crowd", data, MAX_SIDE, None, timeout)["count"]
+
+
+def service_stats():
+    """
+    Request / timeout counters plus per-model batch-size and queue-depth
+    histograms (empty before first use).
+    """
+    if _pool is not None:
+        return _pool.stats()
+    if _batcher is not None:
+        return {"batching": _batcher.stats()}
+    return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fire concurrent detection requests and report throughput / batching")
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--model", default="traffic", choices=["traffic", "accident", "road_damage", "crowd"])
+    parser.add_argument("--concurrency", type=int, default=8, help="simultaneous callers (operators)")
+    parser.add_argument("--requests", type=int, default=64)
+    args = parser.parse_args()
+
+    payloads = []
+    for path in args.images:
+        with open(path, "rb") as f:
+            payloads.append(f.read())
+
+    def call(i):
+        data = payloads[i % len(payloads)]
+        return crowd_count(data) if args.model == "crowd" else detect(args.model, data)
+
+    # one warm-up request so worker start-up is not timed
+    call(0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(call, range(args.requests)))
+    secs = time.perf_counter() - start
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}: "
+          f"{secs:.2f}s — {args.requests / secs:.1f} req/s")
+    for name, s in service_stats().get("batching", {}).items():
+        print(f"{name}: {s['batches']} batches, mean size {s['mean_batch']}, mean wait {s['mean_wait_ms']} ms")
+        print(f"  batch size:  {dict(sorted(s['batch_size'].items(), key=lambda kv: int(kv[0])))}")
+        print(f"  queue depth: {s['queue_depth']}")
+
+
+if __name__ == "__main__":
+    main()
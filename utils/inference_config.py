@@ -0,0 +1,57 @@
+import json
+import os
+
+
+# ---------- per-module YOLO settings ----------
+# one place for every detector's predict() arguments; a JSON file at
+# INFERENCE_CONFIG can override any of them, e.g.
+#   {"traffic": {"imgsz": 480, "classes": [2, 3, 5, 7]}}
+INFERENCE_CONFIG = os.getenv("INFERENCE_CONFIG", "config/inference.json")
+
+DEFAULTS = {
+    "traffic": {"imgsz": 640, "conf": 0.25, "iou": 0.7, "max_det": 300, "classes": None},
+    "accident": {"imgsz": 640, "conf": 0.25, "iou": 0.7, "max_det": 50, "classes": None},
+    "road_damage": {"imgsz": 640, "conf": 0.25, "iou": 0.7, "max_det": 100, "classes": None},
+}
+
+KEYS = ("imgsz", "conf", "iou", "max_det", "classes")
+
+
+def _load():
+    settings = {name: dict(values) for name, values in DEFAULTS.items()}
+
+    if not os.path.exists(INFERENCE_CONFIG):
+        return settings
+
+    with open(INFERENCE_CONFIG) as f:
+        overrides = json.load(f)
+
+    for name, values in overrides.items():
+        if name not in settings:
+            raise ValueError(f"{INFERENCE_CONFIG}: unknown module {name} (expected one of {list(settings)})")
+        unknown = set(values) - set(KEYS)
+        if unknown:
+            raise ValueError(f"{INFERENCE_CONFIG}: unknown keys for {name}: {sorted(unknown)}")
+        settings[name].update(values)
+
+    return settings
+
+
+SETTINGS = _load()
+
+
+def inference_settings(name):
+    """Copy of the settings for one detector (traffic / accident / road_damage)."""
+    return dict(SETTINGS[name])
+
+
+def predict_kwargs(name, **overrides):
+    """
+    Keyword arguments for model(img, ...) of one detector.
+    overrides → per-call changes, e.g. conf=tracker.low_conf
+    """
+    kwargs = inference_settings(name)
+    kwargs.update(overrides)
+    if kwargs.get("classes") is None:
+        kwargs.pop("classes", None)
+    return kwargs
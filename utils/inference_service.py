@@ -0,0 +1,324 @@
+import itertools
+import json
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.batch_scheduler import BATCH_MAX, BATCH_WAIT_MS, MicroBatcher, merge_stats
+from utils.crowd_net import predict_density
+from utils.detections import to_detections
+from utils.image_decode import decode_image
+from utils.model_registry import get_model, preload
+from utils.runtime_tuning import apply as apply_runtime_profile, inference_slot, node_processes
+
+
+# ---------- inference service config (env) ----------
+WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+# models each worker loads at start-up ("" = load on first request)
+PRELOAD = [m for m in os.getenv("INFERENCE_PRELOAD", "traffic,accident,road_damage,crowd").split(",") if m]
+# how often the pool looks for dead workers to fail their requests and replace them
+WORKER_CHECK_SECS = float(os.getenv("INFERENCE_WORKER_CHECK_SECS", "1"))
+
+
+class InferenceTimeout(TimeoutError):
+    pass
+
+
+class InferenceError(RuntimeError):
+    pass
+
+
+# ---------- request handling (runs inside the workers) ----------
+def _run_group(model_name, kwargs, reqs):
+    """Run requests for one model + settings → list of result dicts."""
+    images = [decode_image(r["data"], r["target"]) for r in reqs]
+
+    if model_name == "crowd":
+        results = []
+        for img in images:
+            with inference_slot():
+                count, _ = predict_density(get_model("crowd"), img)
+            results.append({"count": count})
+        return results
+
+    with inference_slot():
+        results = get_model(model_name)(images, verbose=False, **kwargs)
+    return [{"detections": to_detections(res)} for res in results]
+
+
+def batch_key(request):
+    """Requests with the same key can share one forward pass."""
+    return (request["model"], json.dumps(request["kwargs"], sort_keys=True))
+
+
+def handle_batch(reqs):
+    """
+    Serve a list of request dicts {"id", "model", "data", "target",
+    "kwargs", "deadline"} → list of (id, ok, result or error message).
+    Requests past their deadline are answered without running the model.
+    """
+    out = []
+    groups = {}
+    now = time.time()
+
+    for r in reqs:
+        if r["deadline"] is not None and now > r["deadline"]:
+            out.append((r["id"], False, "timeout"))
+            continue
+        groups.setdefault(batch_key(r), []).append(r)
+
+    for (model_name, _), group in groups.items():
+        start = time.perf_counter()
+        try:
+            results = _run_group(model_name, group[0]["kwargs"], group)
+        except Exception as e:
+            out.extend((r["id"], False, f"{type(e).__name__}: {e}") for r in group)
+            continue
+
+        secs = round(time.perf_counter() - start, 4)
+        for r, res in zip(group, results):
+            res["batch_size"] = len(group)
+            res["infer_secs"] = secs
+            out.append((r["id"], True, res))
+
+    return out
+
+
+def run_requests(key, reqs):
+    """MicroBatcher run function → [(ok, result or error)] in request order."""
+    answers = {req_id: (ok, res) for req_id, ok, res in handle_batch(reqs)}
+    return [answers[r["id"]] for r in reqs]
+
+
+def _worker_main(requests, responses, batch_max, batch_wait_ms):
+    # the node's cores are shared by every worker and the app process
+    apply_runtime_profile(processes=node_processes())
+
+    if PRELOAD:
+        try:
+            preload(PRELOAD)
+        except Exception as e:
+            # the failing model errors per request instead of killing the worker
+            print(f"Inference worker preload failed: {e}")
+    pid = os.getpid()
+    responses.put(("ready", pid, None))
+
+    # after every batch the parent gets this worker's histograms
+    batcher = MicroBatcher(
+        run_requests, batch_max, batch_wait_ms,
+        on_batch=lambda: responses.put(("stats", pid, batcher.stats()))
+    )
+
+    def reply(req_id, future):
+        try:
+            ok, result = future.result()
+        except Exception as e:
+            ok, result = False, f"{type(e).__name__}: {e}"
+        responses.put((req_id, ok, result))
+
+    while True:
+        # leave requests in the shared queue for idle workers while
+        # this one already has a full batch waiting
+        while batcher.pending() >= batch_max:
+            time.sleep(0.001)
+
+        request = requests.get()
+        if request is None:
+            break
+        # tell the pool who holds it, so it can fail it if this worker dies
+        responses.put(("claim", pid, request["id"]))
+        future = batcher.submit(batch_key(request), request)
+        future.add_done_callback(lambda f, req_id=request["id"]: reply(req_id, f))
+
+    batcher.close()
+
+
+# ---------- pool (runs in the Streamlit process) ----------
+class InferencePool:
+    """
+    Worker processes hosting the models, fed from one request queue.
+    submit() returns a Future that a dispatcher thread resolves when
+    the worker's answer arrives. Workers report each request they take;
+    when one dies, the requests it held fail at once instead of waiting
+    out the caller's timeout.
+    """
+
+    def __init__(self, workers=WORKERS, batch_max=BATCH_MAX, batch_wait_ms=BATCH_WAIT_MS):
+        # spawn: Streamlit runs many threads, which fork does not copy safely
+        self._ctx = mp.get_context("spawn")
+        self.workers = workers
+        self.batch_max = batch_max
+        self.batch_wait_ms = batch_wait_ms
+
+        self._requests = self._ctx.Queue()
+        self._responses = self._ctx.Queue()
+        self._procs = []
+        self._pending = {}
+        # request id → pid of the worker that took it
+        self._claims = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._ready = 0
+        # worker pid → its latest MicroBatcher.stats()
+        self._batch_stats = {}
+
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "restarts": 0,
+            "lost": 0,
+        }
+
+        for _ in range(workers):
+            self._spawn()
+
+        self._dispatcher = threading.Thread(target=self._dispatch, name="inference-dispatch", daemon=True)
+        self._dispatcher.start()
+        self._monitor = threading.Thread(target=self._watch, name="inference-watch", daemon=True)
+        self._monitor.start()
+
+    def _spawn(self):
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(self._requests, self._responses, self.batch_max, self.batch_wait_ms),
+            daemon=True,
+        )
+        proc.start()
+        self._procs.append(proc)
+
+    def _ensure_workers(self):
+        """Replace workers that died (e.g. out of memory on a huge image)."""
+        with self._lock:
+            if self._closed:
+                return
+            alive = [p.is_alive() for p in self._procs]
+            dead = [p for p, up in zip(self._procs, alive) if not up]
+            self._procs = [p for p, up in zip(self._procs, alive) if up]
+            self._stats["restarts"] += len(dead)
+        for proc in dead:
+            # queued behind everything the worker sent before dying, so the
+            # dispatcher sees its claims and answers first
+            self._responses.put(("dead", proc.pid, None))
+            self._spawn()
+
+    def _watch(self):
+        while not self._closed:
+            time.sleep(WORKER_CHECK_SECS)
+            self._ensure_workers()
+
+    def _fail_claims(self, pid):
+        """Fail the requests a dead worker took but never answered."""
+        with self._lock:
+            lost = [req_id for req_id, owner in self._claims.items() if owner == pid]
+            futures = []
+            for req_id in lost:
+                del self._claims[req_id]
+                future = self._pending.pop(req_id, None)
+                if future is not None:
+                    futures.append(future)
+            self._stats["failed"] += len(futures)
+            self._stats["lost"] += len(futures)
+
+        for future in futures:
+            if not future.done():
+                future.set_exception(InferenceError(f"inference worker {pid} exited while serving the request"))
+
+    def _dispatch(self):
+        while True:
+            try:
+                req_id, ok, result = self._responses.get()
+            except (EOFError, OSError):
+                return
+            if req_id == "ready":
+                self._ready += 1
+                continue
+            if req_id == "stats":
+                with self._lock:
+                    self._batch_stats[ok] = result
+                continue
+            if req_id == "claim":
+                with self._lock:
+                    if result in self._pending:
+                        self._claims[result] = ok
+                continue
+            if req_id == "dead":
+                self._fail_claims(ok)
+                continue
+
+            with self._lock:
+                self._claims.pop(req_id, None)
+                future = self._pending.pop(req_id, None)
+                # the caller gave up already and was counted in forget()
+                if future is None:
+                    continue
+                if ok:
+                    self._stats["completed"] += 1
+                elif result == "timeout":
+                    self._stats["timeouts"] += 1
+                else:
+                    self._stats["failed"] += 1
+
+            if future.done():
+                continue
+            if ok:
+                future.set_result(result)
+            elif result == "timeout":
+                future.set_exception(InferenceTimeout("request expired in the queue"))
+            else:
+                future.set_exception(InferenceError(result))
+
+    def submit(self, model_name, data, target=None, kwargs=None, timeout=None):
+        if self._closed:
+            raise InferenceError("inference pool is closed")
+        self._ensure_workers()
+
+        req_id = next(self._ids)
+        future = Future()
+        with self._lock:
+            self._pending[req_id] = future
+            self._stats["submitted"] += 1
+
+        self._requests.put({
+            "id": req_id,
+            "model": model_name,
+            "data": data,
+            "target": target,
+            "kwargs": kwargs or {},
+            "deadline": time.time() + timeout if timeout else None,
+        })
+        return future
+
+    def forget(self, future):
+        """Drop a future the caller stopped waiting for."""
+        with self._lock:
+            for req_id, f in list(self._pending.items()):
+                if f is future:
+                    del self._pending[req_id]
+                    self._claims.pop(req_id, None)
+                    self._stats["timeouts"] += 1
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        for _ in self._procs:
+            self._requests.put(None)
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "workers": len(self._procs),
+                "workers_ready": self._ready,
+                "pending": len(self._pending),
+                # per model: batch-size and queue-depth histograms
+                "batching": merge_stats(self._batch_stats.values()),
+            }
@@ -28,3 +28,19 @@ def ensure_model(local_path, s3_key):
     )
 
     print("Download complete")
+
+
+def publish_model(local_path, s3_key):
+    """
+    Upload a converted model artifact so other nodes can fetch it
+    through ensure_model.
+    """
+    print(f"Uploading to S3: {s3_key}")
+
+    s3.upload_file(
+        Filename=local_path,
+        Bucket=BUCKET_NAME,
+        Key=s3_key
+    )
+
+    print("Upload complete")
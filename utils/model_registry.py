@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+
+import numpy as np
+import torch
+
+from utils.crowd_net import CROWD_BACKEND, CROWD_WEIGHTS, load_crowd
+from utils.model_loader import ensure_model
+from utils.runtime_tuning import apply as apply_runtime_profile
+
+
+# ---------- models shared by every page ----------
+# name → local weights path (the S3 key mirrors the local path)
+MODEL_SPECS = {
+    "traffic": {"path": "models/traffic_best.pt", "kind": "yolo"},
+    "accident": {"path": "models/accident_best.pt", "kind": "yolo"},
+    "road_damage": {"path": "models/road_damage_yolo.pt", "kind": "yolo"},
+    # CROWD_BACKEND picks eager / TorchScript / ONNX fp32 / ONNX int8
+    "crowd": {"path": CROWD_WEIGHTS[CROWD_BACKEND], "kind": "crowd"},
+}
+
+# pt → ultralytics .pt weights, onnx → the exported .onnx next to them
+# (see utils.yolo_export); falls back to .pt when no export exists
+YOLO_BACKEND = os.getenv("YOLO_BACKEND", "pt")
+
+# module globals live once per process, so every Streamlit session
+# and every rerun reuses the same loaded weights
+_models = {}
+_stats = {}
+# name → (weights path, version), resolved once: ensure_model and the
+# ONNX fallback stay off the per-request path (model_version)
+_resolved = {}
+_resolve_lock = threading.Lock()
+_locks = {name: threading.Lock() for name in MODEL_SPECS}
+
+
+# ---------- memory helpers ----------
+def rss_bytes():
+    """Resident set size of this process (Linux), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _param_bytes(module):
+    return sum(p.numel() * p.element_size() for p in module.parameters())
+
+
+# ---------- loaders ----------
+def _load_yolo(path):
+    from ultralytics import YOLO
+
+    model = YOLO(path, task="detect")
+    # first call fuses layers and builds the predictor
+    model(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+    if isinstance(model.model, torch.nn.Module):
+        return model, _param_bytes(model.model)
+    return model, os.path.getsize(path)
+
+
+def _load_crowd(path):
+    model = load_crowd(CROWD_BACKEND, path)
+    with torch.no_grad():
+        model(torch.zeros(1, 3, 256, 256))
+    if isinstance(model, torch.nn.Module):
+        return model, _param_bytes(model)
+    # ONNX sessions hold their weights outside torch
+    return model, os.path.getsize(path)
+
+
+_LOADERS = {
+    "yolo": _load_yolo,
+    "crowd": _load_crowd,
+}
+
+
+def onnx_path(path):
+    return os.path.splitext(path)[0] + ".onnx"
+
+
+def _resolve_path(spec):
+    """Weights file to load for a spec, honouring YOLO_BACKEND."""
+    if spec["kind"] != "yolo" or YOLO_BACKEND != "onnx":
+        ensure_model(spec["path"], spec["path"])
+        return spec["path"]
+
+    path = onnx_path(spec["path"])
+    try:
+        ensure_model(path, path)
+        return path
+    except Exception as e:
+        print(f"No ONNX export for {spec['path']} ({e}), using .pt")
+        ensure_model(spec["path"], spec["path"])
+        return spec["path"]
+
+
+def _resolve(name):
+    """(path, version) a model loads from, resolved once per process."""
+    resolved = _resolved.get(name)
+    if resolved is not None:
+        return resolved
+
+    with _resolve_lock:
+        if name not in _resolved:
+            path = _resolve_path(MODEL_SPECS[name])
+            _resolved[name] = (path, _version(path))
+        return _resolved[name]
+
+
+def get_model(name):
+    """
+    Return the process-wide instance of a model, loading and warming
+    it up on first use.
+    name → one of MODEL_SPECS
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    spec = MODEL_SPECS[name]
+
+    with _locks[name]:
+        # another session may have finished loading while we waited
+        if name in _models:
+            return _models[name]
+
+        path, version = _resolve(name)
+        # thread counts must be set before the first model runs
+        apply_runtime_profile()
+
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+
+        model, param_bytes = _LOADERS[spec["kind"]](path)
+
+        load_secs = time.perf_counter() - start
+        rss_after = rss_bytes()
+
+        _stats[name] = {
+            "path": path,
+            "version": version,
+            "load_secs": round(load_secs, 3),
+            "param_mb": round(param_bytes / 2**20, 1),
+            "rss_delta_mb": (
+                round((rss_after - rss_before) / 2**20, 1)
+                if rss_before is not None and rss_after is not None
+                else None
+            ),
+        }
+        print(f"Model ready: {name} ({_stats[name]})")
+
+        _models[name] = model
+        return model
+
+
+def preload(names=None):
+    """Load every model (or the given subset) up front."""
+    for name in names or MODEL_SPECS:
+        get_model(name)
+
+
+def _version(path):
+    info = os.stat(path)
+    # changes whenever the weights file is replaced
+    return f"{path}:{info.st_size}:{int(info.st_mtime)}"
+
+
+def model_version(name):
+    """
+    Identifier of the weights a model is (or would be) loaded from.
+    Does not load the model, so processes that only dispatch to the
+    inference workers can call it too.
+    """
+    return _resolve(name)[1]
+
+
+def model_stats():
+    """Load time and memory per loaded model."""
+    return {name: dict(s) for name, s in _stats.items()}
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from utils.model_registry import model_version
+
+
+# ---------- result cache config (env) ----------
+CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))
+# directory for on-disk persistence across restarts ("" = memory only)
+CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "")
+CACHE_DISK_ENTRIES = int(os.getenv("RESULT_CACHE_DISK_ENTRIES", "5000"))
+# (key, scope) pairs remembered as logged, independent of result eviction
+LOGGED_ENTRIES = int(os.getenv("RESULT_CACHE_LOGGED_ENTRIES", "20000"))
+
+
+def cache_key(data, model_name, settings=None):
+    """
+    SHA-256 of the uploaded bytes + loaded model version + inference
+    settings, so a new model or changed thresholds never reuse old results.
+    """
+    h = hashlib.sha256(data)
+    h.update(b"\0" + model_name.encode())
+    h.update(b"\0" + model_version(model_name).encode())
+    h.update(b"\0" + json.dumps(settings or {}, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU of detection results keyed by cache_key().
+    Entries are JSON-serializable dicts (detections, level, image_url ...);
+    "logged" records which city/area already got a DB row for the input;
+    a separate, larger LRU of logged (key, scope) pairs keeps duplicate
+    inserts blocked after the result itself is evicted.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE, cache_dir=CACHE_DIR, disk_entries=CACHE_DISK_ENTRIES,
+                 logged_entries=LOGGED_ENTRIES):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.disk_entries = disk_entries
+        self.logged_entries = logged_entries
+        self._entries = OrderedDict()
+        self._logged = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "deduped_inserts": 0}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    # ---------- disk ----------
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, entry):
+        # write-then-rename so a crash never leaves half a file behind
+        tmp = self._path(key) + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            print(f"Result cache write failed: {e}")
+
+    def _prune_disk(self):
+        files = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".json")]
+        if len(files) <= self.disk_entries:
+            return
+        files.sort(key=lambda e: e.stat().st_mtime)
+        for e in files[:len(files) - self.disk_entries]:
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+
+    # ---------- memory ----------
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key):
+        """Copy of the cached entry, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return json.loads(json.dumps(entry))
+
+        entry = self._read_disk(key) if self.cache_dir else None
+
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._remember(key, entry)
+            self._stats["disk_hits"] += 1
+            return json.loads(json.dumps(entry))
+
+    def put(self, key, entry):
+        entry = dict(entry)
+        entry.setdefault("logged", [])
+        entry.setdefault("created", time.time())
+
+        with self._lock:
+            self._remember(key, entry)
+            self._puts += 1
+            prune = self.cache_dir and self._puts % 100 == 0
+
+        if self.cache_dir:
+            self._write_disk(key, entry)
+            if prune:
+                self._prune_disk()
+        return entry
+
+    def _seen(self, key, scope):
+        """True (and counted) if (key, scope) is already logged; caller holds the lock."""
+        if (key, scope) not in self._logged:
+            return False
+        self._logged.move_to_end((key, scope))
+        self._stats["deduped_inserts"] += 1
+        return True
+
+    def mark_logged(self, key, scope):
+        """
+        Record that the result for key was stored for scope (e.g. city-area).
+        Returns False if it already was, i.e. the insert should be skipped.
+        Works for keys whose result was evicted (or never cached) as long as
+        the pair is within the logged LRU or the disk copy records it.
+        """
+        with self._lock:
+            if self._seen(key, scope):
+                return False
+            entry = self._entries.get(key)
+
+        # evicted from memory: the disk copy may still list the scope
+        if entry is None and self.cache_dir:
+            entry = self._read_disk(key)
+
+        with self._lock:
+            if entry is not None and scope in entry["logged"]:
+                self._logged[(key, scope)] = True
+                self._stats["deduped_inserts"] += 1
+                return False
+            # another session may have logged it meanwhile
+            if self._seen(key, scope):
+                return False
+
+            self._logged[(key, scope)] = True
+            while len(self._logged) > self.logged_entries:
+                self._logged.popitem(last=False)
+
+            snapshot = None
+            if entry is not None:
+                entry["logged"].append(scope)
+                snapshot = dict(entry)
+
+        if self.cache_dir and snapshot is not None:
+            self._write_disk(key, snapshot)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "logged": len(self._logged)}
+
+
+# one cache per process, shared by every Streamlit session
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache()
+    return _cache
+
+
+def cache_stats():
+    return get_cache().stats()
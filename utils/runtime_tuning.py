@@ -0,0 +1,282 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+import torch
+
+
+# ---------- node profile config (env) ----------
+# profile name or core count from RUNTIME_PROFILES; "auto" = this node's cores
+NODE_PROFILE = os.getenv("NODE_PROFILE", "auto")
+RUNTIME_PROFILES = os.getenv("RUNTIME_PROFILES", "config/runtime_profiles.json")
+
+# individual overrides win over the profile
+_OVERRIDES = {
+    "torch_threads": os.getenv("TORCH_THREADS"),
+    "interop_threads": os.getenv("TORCH_INTEROP_THREADS"),
+    "cv2_threads": os.getenv("CV2_THREADS"),
+}
+
+KEYS = ("torch_threads", "interop_threads", "cv2_threads")
+
+
+def cpu_cores():
+    """Cores this process may run on (respects taskset / container cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def node_processes():
+    """
+    Inference processes sharing this node: the pool workers plus the app
+    process (batch / video ingestion still run in it), or just this one.
+    """
+    # imported here: both modules import this one
+    from utils.inference_client import INFERENCE_MODE
+    from utils.inference_service import WORKERS
+
+    return WORKERS + 1 if INFERENCE_MODE == "pool" else 1
+
+
+def default_profile(cores, processes=1):
+    """Split the cores evenly across inference processes."""
+    per_process = max(1, cores // max(1, processes))
+    return {
+        "torch_threads": per_process,
+        "interop_threads": 1 if per_process <= 4 else 2,
+        "cv2_threads": max(1, per_process // 2),
+    }
+
+
+def load_profiles(path=RUNTIME_PROFILES):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def resolve_profile(name=NODE_PROFILE, processes=1):
+    """
+    Settings for this node: a named profile or a core-count entry from
+    RUNTIME_PROFILES (as written by the benchmark), else default_profile().
+    Per-process values are divided by processes when the profile is per node.
+    """
+    cores = cpu_cores()
+    profiles = load_profiles()
+    key = str(cores) if name == "auto" else name
+
+    if key in profiles:
+        # older files may carry extra keys (e.g. a concurrency setting)
+        profile = {k: profiles[key][k] for k in KEYS}
+        if processes > 1:
+            profile["torch_threads"] = max(1, profile["torch_threads"] // processes)
+            profile["cv2_threads"] = max(1, profile["cv2_threads"] // processes)
+    else:
+        if name != "auto":
+            print(f"Runtime profile {name} not found in {RUNTIME_PROFILES}, using defaults")
+        profile = default_profile(cores, processes)
+
+    for k, v in _OVERRIDES.items():
+        if v:
+            profile[k] = int(v)
+    return profile
+
+
+# ---------- applying ----------
+_applied = None
+_apply_lock = threading.Lock()
+# models are shared per process (model_registry) and their predictors are
+# not thread-safe, so one model call runs at a time in each process;
+# parallelism comes from the inference worker processes
+_slot = threading.Lock()
+
+
+def apply(processes=None, profile=None):
+    """
+    Set torch / OpenCV thread counts once per process; later calls
+    return the settings already applied.
+    processes → inference processes sharing this node (default: node_processes())
+    """
+    global _applied
+
+    with _apply_lock:
+        if _applied is not None:
+            return dict(_applied)
+
+        profile = profile or resolve_profile(processes=processes or node_processes())
+
+        torch.set_num_threads(profile["torch_threads"])
+        try:
+            torch.set_num_interop_threads(profile["interop_threads"])
+        except RuntimeError:
+            # only allowed before the first parallel torch op
+            print("Torch interop threads already fixed for this process")
+        cv2.setNumThreads(profile["cv2_threads"])
+
+        _applied = dict(profile)
+        print(f"Runtime profile applied: {_applied}")
+        return dict(_applied)
+
+
+@contextmanager
+def inference_slot():
+    """Hold this process's single inference slot while running a shared model."""
+    if _applied is None:
+        apply()
+    with _slot:
+        yield
+
+
+def applied_profile():
+    return dict(_applied) if _applied is not None else {}
+
+
+# ---------- benchmark ----------
+def _trial(model_name, paths, rounds):
+    """Throughput / latency of one setting in this (fresh) process."""
+    # imported here: model_registry applies the profile through this module
+    from utils.crowd_net import predict_density
+    from utils.model_registry import get_model
+
+    images = [cv2.imread(p) for p in paths]
+    images = [img for img in images if img is not None]
+    model = get_model(model_name)
+
+    def run(img):
+        start = time.perf_counter()
+        with inference_slot():
+            if model_name == "crowd":
+                predict_density(model, img)
+            else:
+                model(img, verbose=False)
+        return time.perf_counter() - start
+
+    run(images[0])
+    work = images * rounds
+
+    # one call at a time, as in the app (see inference_slot)
+    start = time.perf_counter()
+    latencies = [run(img) for img in work]
+    secs = time.perf_counter() - start
+
+    return {
+        "images_per_sec": round(len(work) / secs, 2),
+        "p95_ms": round(1000 * float(np.percentile(latencies, 95)), 1),
+    }
+
+
+def candidate_settings(cores):
+    threads = sorted({1, 2, 4, cores // 2, cores} - {0})
+    threads = [t for t in threads if t <= cores]
+    for t in threads:
+        for interop in (1, 2):
+            yield {
+                "torch_threads": t,
+                "interop_threads": interop,
+                "cv2_threads": max(1, t // 2),
+            }
+
+
+def sweep(model_name, paths, rounds=3, cores=None):
+    """
+    Run every candidate setting in its own process (interop threads can
+    only be set once per process), pinned to `cores` cores
+    → list of (settings, result).
+    """
+    cores = cores or cpu_cores()
+    rows = []
+
+    for settings in candidate_settings(cores):
+        cmd = [
+            sys.executable, "-m", "utils.runtime_tuning", "trial",
+            "--model", model_name, "--rounds", str(rounds), "--cores", str(cores),
+            "--settings", json.dumps(settings), *paths,
+        ]
+        out = subprocess.run(cmd, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"Trial failed for {settings}: {out.stderr.strip().splitlines()[-1:]}")
+            continue
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        rows.append((settings, result))
+        print(f"{settings} → {result}")
+
+    return rows
+
+
+def recommend(rows):
+    """Highest throughput; lower p95 latency breaks near-ties (within 5%)."""
+    if not rows:
+        return None
+    best = max(r["images_per_sec"] for _, r in rows)
+    close = [(s, r) for s, r in rows if r["images_per_sec"] >= 0.95 * best]
+    return min(close, key=lambda sr: sr[1]["p95_ms"])
+
+
+def write_profile(key, settings, path=RUNTIME_PROFILES):
+    profiles = load_profiles(path)
+    profiles[str(key)] = {k: settings[k] for k in KEYS}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profiles, f, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Node runtime profile: show, or benchmark thread settings")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("show", help="print the profile this node would apply")
+
+    p_bench = sub.add_parser("bench", help="sweep thread settings on a model")
+    p_bench.add_argument("images", nargs="+")
+    p_bench.add_argument("--model", default="traffic", choices=["traffic", "accident", "road_damage", "crowd"])
+    p_bench.add_argument("--rounds", type=int, default=3)
+    p_bench.add_argument("--cores", type=int, default=None, help="core count to tune for (default: this node)")
+    p_bench.add_argument("--write", action="store_true", help=f"save the recommendation to {RUNTIME_PROFILES}")
+
+    p_trial = sub.add_parser("trial")
+    p_trial.add_argument("images", nargs="+")
+    p_trial.add_argument("--model", required=True)
+    p_trial.add_argument("--rounds", type=int, default=3)
+    p_trial.add_argument("--settings", required=True)
+    p_trial.add_argument("--cores", type=int, default=None)
+
+    args = parser.parse_args()
+
+    if args.cmd == "show":
+        processes = node_processes()
+        print(f"cores: {cpu_cores()}  profile: {NODE_PROFILE}  inference processes: {processes}")
+        print(resolve_profile(processes=processes))
+        return
+
+    if args.cmd == "trial":
+        settings = json.loads(args.settings)
+        if args.cores:
+            # emulate a smaller node on this one
+            os.sched_setaffinity(0, sorted(os.sched_getaffinity(0))[:args.cores])
+        apply(profile=settings)
+        print(json.dumps(_trial(args.model, args.images, args.rounds)))
+        return
+
+    cores = args.cores or cpu_cores()
+    best = recommend(sweep(args.model, args.images, args.rounds, cores))
+    if best is None:
+        raise SystemExit("no trial succeeded")
+
+    settings, result = best
+    print(f"recommended for {cores} cores: {settings} ({result['images_per_sec']} images/sec, p95 {result['p95_ms']} ms)")
+    if args.write:
+        write_profile(cores, settings)
+        print(f"saved to {RUNTIME_PROFILES}")
+
+
+if __name__ == "__main__":
+    main()
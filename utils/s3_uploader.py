@@ -1,19 +1,55 @@
 import boto3
+import cv2
+import io
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
 s3 = boto3.client("s3")
 
 BUCKET_NAME = "urbanbot-storage"
 
+# ---------- background upload config (env) ----------
+UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "4"))
+UPLOAD_RETRIES = int(os.getenv("S3_UPLOAD_RETRIES", "3"))
+STATUS_KEEP = 1000
+
+# ---------- in-memory encoding config (env) ----------
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "jpg").lower()       # jpg / webp
+JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "90"))
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "85"))
+
+CONTENT_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="s3-upload")
+
+# s3_key → {"state": pending/done/failed, "attempts", "secs", "error"}
+_status = OrderedDict()
+_status_lock = threading.Lock()
+
+
+def _new_key(category, ext):
+    return f"detected-images/{category}/{uuid4()}{ext}"
+
+
+def _url(s3_key):
+    return f"https://{BUCKET_NAME}.s3.amazonaws.com/{s3_key}"
+
+
 def upload_image_to_s3(local_path, category):
     """
     category: traffic / accident / crowd / road_damage
     """
     ext = os.path.splitext(local_path)[1]
-    image_name = f"{uuid4()}{ext}"
-
-    s3_key = f"detected-images/{category}/{image_name}"
+    s3_key = _new_key(category, ext)
 
     s3.upload_file(
         Filename=local_path,
@@ -21,5 +57,95 @@ def upload_image_to_s3(local_path, category):
         Key=s3_key
     )
 
-    s3_url = f"https://{BUCKET_NAME}.s3.amazonaws.com/{s3_key}"
-    return s3_url
+    return _url(s3_key)
+
+
+# ---------- in-memory path (no temp files) ----------
+def encode_image(img, fmt=None):
+    """
+    Encode a BGR frame in memory → (bytes, ext).
+    fmt: jpg / webp (defaults to IMAGE_FORMAT)
+    """
+    fmt = (fmt or IMAGE_FORMAT).lower()
+
+    if fmt == "webp":
+        ext, params = ".webp", [cv2.IMWRITE_WEBP_QUALITY, WEBP_QUALITY]
+    else:
+        ext, params = ".jpg", [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+
+    ok, buf = cv2.imencode(ext, img, params)
+    if not ok:
+        raise ValueError(f"Could not encode image as {ext}")
+    return buf.tobytes(), ext
+
+
+def _put_bytes(data, s3_key, ext):
+    s3.upload_fileobj(
+        io.BytesIO(data),
+        BUCKET_NAME,
+        s3_key,
+        ExtraArgs={"ContentType": CONTENT_TYPES.get(ext, "application/octet-stream")}
+    )
+
+
+def upload_image_bytes(data, category, ext=".jpg"):
+    """
+    Upload already-encoded image bytes straight from memory.
+    category: traffic / accident / crowd / road_damage
+    """
+    s3_key = _new_key(category, ext)
+    _put_bytes(data, s3_key, ext)
+    return _url(s3_key)
+
+
+# ---------- upload-after-respond ----------
+def _set_status(s3_key, **fields):
+    with _status_lock:
+        entry = _status.setdefault(s3_key, {})
+        entry.update(fields)
+        _status.move_to_end(s3_key)
+        while len(_status) > STATUS_KEEP:
+            _status.popitem(last=False)
+
+
+def _upload_with_retries(data, s3_key, ext):
+    start = time.perf_counter()
+
+    for attempt in range(1, UPLOAD_RETRIES + 1):
+        try:
+            _put_bytes(data, s3_key, ext)
+            _set_status(
+                s3_key, state="done", attempts=attempt,
+                secs=round(time.perf_counter() - start, 3), error=None
+            )
+            return True
+        except Exception as e:
+            _set_status(s3_key, attempts=attempt, error=str(e))
+            if attempt < UPLOAD_RETRIES:
+                time.sleep(0.5 * 2 ** (attempt - 1))
+
+    _set_status(s3_key, state="failed", secs=round(time.perf_counter() - start, 3))
+    print(f"S3 upload failed after {UPLOAD_RETRIES} attempts: {s3_key}")
+    return False
+
+
+def upload_image_async(data, category, ext=".jpg"):
+    """
+    Queue encoded image bytes (see encode_image) for upload and return
+    the final S3 URL right away; the object appears once the background
+    upload finishes.
+    category: traffic / accident / crowd / road_damage
+    """
+    s3_key = _new_key(category, ext)
+    _set_status(s3_key, state="pending", attempts=0, secs=None, error=None)
+
+    _executor.submit(_upload_with_retries, data, s3_key, ext)
+    return _url(s3_key)
+
+
+def upload_status(url):
+    """Status dict for a URL returned by upload_image_async (None if unknown)."""
+    s3_key = url.split(".amazonaws.com/", 1)[-1]
+    with _status_lock:
+        entry = _status.get(s3_key)
+        return dict(entry) if entry else None
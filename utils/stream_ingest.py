@@ -0,0 +1,343 @@
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from databases.accident_detection_db import insert_accident_log
+from databases.alerts_db import insert_system_alert
+from databases.traffic_detection_db import insert_traffic_log
+from utils.city_data import CITY_AREA_DATA
+from utils.detection_rules import accident_severity, congestion_level, is_peak_hour
+from utils.inference_config import predict_kwargs
+from utils.model_registry import get_model
+from utils.runtime_tuning import inference_slot
+from utils.s3_uploader import encode_image, upload_image_async
+from utils.tracker import VehicleTracker
+
+
+# ---------- stream config (env) ----------
+SAMPLE_FPS = float(os.getenv("STREAM_SAMPLE_FPS", "2"))
+WINDOW_SECS = float(os.getenv("STREAM_WINDOW_SECS", "60"))
+BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "8"))
+# mean absolute grey-level change (0-255) on a thumbnail below which a
+# frame counts as a near-duplicate of the last inferred one
+DIFF_THRESHOLD = float(os.getenv("STREAM_DIFF_THRESHOLD", "6"))
+# infer at least every N sampled frames even on a static scene
+MAX_SKIP = int(os.getenv("STREAM_MAX_SKIP", "10"))
+
+MODES = ("traffic", "accident")
+
+
+# ---------- adaptive sampling ----------
+class FrameSampler:
+    """Drops frames that barely differ from the last kept frame."""
+
+    def __init__(self, diff_threshold=DIFF_THRESHOLD, max_skip=MAX_SKIP, thumb=(64, 36)):
+        self.diff_threshold = diff_threshold
+        self.max_skip = max_skip
+        self.thumb = thumb
+        self._last = None
+        self._skipped = 0
+
+    def keep(self, frame):
+        small = cv2.cvtColor(
+            cv2.resize(frame, self.thumb, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY
+        ).astype(np.int16)
+
+        if (self._last is None
+                or self._skipped >= self.max_skip
+                or np.abs(small - self._last).mean() >= self.diff_threshold):
+            self._last = small
+            self._skipped = 0
+            return True
+
+        self._skipped += 1
+        return False
+
+
+# ---------- per-window aggregation ----------
+class _Window:
+    def __init__(self, start):
+        self.start = start
+        self.end = start
+        self.vehicle_counts = []     # tracked vehicles visible per frame
+        self.busiest = None          # (count, frame, xyxy list)
+        self.accident_conf = 0.0
+        self.accident_frame = None
+
+    def add_traffic(self, frame, tracks):
+        count = len(tracks)
+        self.vehicle_counts.append(count)
+        if self.busiest is None or count > self.busiest[0]:
+            self.busiest = (count, frame, [tr.box for tr in tracks])
+
+    def add_accident(self, frame, boxes):
+        if boxes is None or len(boxes) == 0:
+            return
+        conf = float(boxes.conf.max())
+        if conf > self.accident_conf:
+            self.accident_conf = conf
+            self.accident_frame = (frame, boxes.xyxy.tolist())
+
+
+def _annotate(frame, xyxy, color):
+    img = frame.copy()
+    for x1, y1, x2, y2 in xyxy:
+        cv2.rectangle(img, (int(x1), int(y1)), (int(x2), int(y2)), color, 3)
+    return img
+
+
+def _upload(frame, category):
+    data, ext = encode_image(frame)
+    return upload_image_async(data, category=category, ext=ext)
+
+
+def _emit(window, tracker, state, city, area, log, alerts):
+    """
+    Turn one window into traffic / accident events; returns event dicts.
+    Traffic is only logged when the congestion level differs from the
+    last logged one (state["level"]).
+    """
+    lat, lon = CITY_AREA_DATA[city][area]
+    now = datetime.now()
+    events = []
+
+    if window.vehicle_counts:
+        peak, frame, boxes = window.busiest
+        level = congestion_level(peak)
+        unique = tracker.unique_between(window.start, window.end)
+        changed = level != state.get("level")
+
+        event = {
+            "type": "traffic",
+            "window_start": window.start,
+            "frames": len(window.vehicle_counts),
+            "vehicle_count": peak,
+            "unique_vehicles": unique,
+            "flow_per_min": round(tracker.flow_rate(window.start, window.end), 1),
+            "congestion": level,
+            "logged": log and changed,
+        }
+        if log and changed:
+            image_url = _upload(_annotate(frame, boxes, (0, 200, 0)), "traffic")
+            insert_traffic_log((now, city, area, lat, lon, peak, level, is_peak_hour(now), image_url))
+            state["level"] = level
+        events.append(event)
+        tracker.forget_before(window.start)
+
+    if window.accident_frame is not None:
+        severity = accident_severity(window.accident_conf)
+        event = {
+            "type": "accident",
+            "window_start": window.start,
+            "confidence": round(window.accident_conf, 3),
+            "severity": severity,
+            "logged": log,
+        }
+        if log:
+            frame, boxes = window.accident_frame
+            image_url = _upload(_annotate(frame, boxes, (0, 180, 0)), "accident")
+            insert_accident_log((str(uuid.uuid4()), now, image_url, city, area, lat, lon, severity, False))
+            if alerts:
+                insert_system_alert(
+                    alert_type="accident",
+                    location=city,
+                    severity=severity,
+                    message="🚨 UrbanBot Accident Alert (video stream)",
+                    email_sent=False
+                )
+        events.append(event)
+
+    return events
+
+
+# ---------- ingestion ----------
+def ingest(source, city, area, modes=MODES, sample_fps=SAMPLE_FPS,
+           window_secs=WINDOW_SECS, batch_size=BATCH_SIZE,
+           diff_threshold=DIFF_THRESHOLD, max_frames=None,
+           log=True, alerts=True, on_event=None):
+    """
+    Read a video file or stream URL, sample frames, run the shared YOLO
+    models in batches and emit one event per model per window.
+    source → file path, rtsp://... URL or camera index
+    Returns (events, stats).
+    """
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video source: {source}")
+
+    models = {m: get_model(m) for m in modes}
+    sampler = FrameSampler(diff_threshold)
+
+    # traffic counts come from tracked vehicles, so the same car seen in
+    # consecutive frames is counted once; low-confidence boxes are kept
+    # for the tracker's second association pass
+    tracker = VehicleTracker()
+    traffic_state = {}
+    call_kwargs = {
+        "traffic": predict_kwargs("traffic", conf=tracker.low_conf),
+        "accident": predict_kwargs("accident"),
+    }
+
+    src_fps = cap.get(cv2.CAP_PROP_FPS) or 0
+    stride = max(1, round(src_fps / sample_fps)) if src_fps > 0 else 1
+
+    stats = {
+        "frames_in": 0,
+        "frames_sampled": 0,
+        "frames_inferred": 0,
+        "batches": 0,
+        "infer_secs": 0.0,
+        "windows": 0,
+    }
+    events = []
+    batch = []
+    window = None
+    wall_start = time.perf_counter()
+
+    def run_batch():
+        start = time.perf_counter()
+        frames = [f for _, f in batch]
+        with inference_slot():
+            results = {
+                m: model(frames, verbose=False, **call_kwargs[m])
+                for m, model in models.items()
+            }
+        stats["infer_secs"] += time.perf_counter() - start
+        stats["batches"] += 1
+        stats["frames_inferred"] += len(frames)
+
+        for i, (t, frame) in enumerate(batch):
+            if "traffic" in results:
+                boxes = results["traffic"][i].boxes
+                tracks = tracker.update(
+                    boxes.xyxy.cpu().numpy() if boxes is not None else [],
+                    boxes.conf.cpu().numpy() if boxes is not None else [],
+                    t
+                )
+                window.add_traffic(frame, tracks)
+            if "accident" in results:
+                window.add_accident(frame, results["accident"][i].boxes)
+        batch.clear()
+
+    def close_window():
+        new = _emit(window, tracker, traffic_state, city, area, log, alerts)
+        stats["windows"] += 1
+        events.extend(new)
+        if on_event:
+            for e in new:
+                on_event(e)
+
+    try:
+        while max_frames is None or stats["frames_in"] < max_frames:
+            # grab() skips decoding for frames the stride drops
+            if not cap.grab():
+                break
+            stats["frames_in"] += 1
+
+            if (stats["frames_in"] - 1) % stride:
+                continue
+
+            ok, frame = cap.retrieve()
+            if not ok:
+                break
+            stats["frames_sampled"] += 1
+
+            # position in the video for files, wall clock for live streams
+            pos = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            t = pos if pos > 0 else time.perf_counter() - wall_start
+
+            if window is None:
+                window = _Window(t)
+            elif t - window.start >= window_secs:
+                if batch:
+                    run_batch()
+                close_window()
+                window = _Window(t)
+            window.end = t
+
+            if sampler.keep(frame):
+                batch.append((t, frame))
+                if len(batch) >= batch_size:
+                    run_batch()
+
+        if window is not None:
+            if batch:
+                run_batch()
+            close_window()
+    finally:
+        cap.release()
+
+    stats["infer_secs"] = round(stats["infer_secs"], 3)
+    stats["wall_secs"] = round(time.perf_counter() - wall_start, 3)
+    stats["ms_per_inferred_frame"] = (
+        round(1000 * stats["infer_secs"] / stats["frames_inferred"], 1)
+        if stats["frames_inferred"] else 0.0
+    )
+    return events, stats
+
+
+def ingest_bytes(data, suffix, city, area, **kwargs):
+    """
+    ingest() for an uploaded video. VideoCapture needs a path, so the bytes
+    go to a private temp file that is removed afterwards.
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return ingest(path, city, area, **kwargs)
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Traffic / accident detection on a video file or stream")
+    parser.add_argument("source", help="video file, rtsp:// URL or camera index")
+    parser.add_argument("--city", required=True, choices=list(CITY_AREA_DATA))
+    parser.add_argument("--area", required=True)
+    parser.add_argument("--modes", default="traffic,accident", help="comma-separated: traffic,accident")
+    parser.add_argument("--sample-fps", type=float, default=SAMPLE_FPS)
+    parser.add_argument("--window-secs", type=float, default=WINDOW_SECS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--diff-threshold", type=float, default=DIFF_THRESHOLD)
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="print events without logging them")
+    args = parser.parse_args()
+
+    if args.area not in CITY_AREA_DATA[args.city]:
+        parser.error(f"area must be one of {list(CITY_AREA_DATA[args.city])}")
+
+    modes = tuple(m for m in args.modes.split(",") if m)
+    if any(m not in MODES for m in modes):
+        parser.error(f"modes must be among {MODES}")
+
+    source = int(args.source) if args.source.isdigit() else args.source
+
+    _, stats = ingest(
+        source, args.city, args.area,
+        modes=modes,
+        sample_fps=args.sample_fps,
+        window_secs=args.window_secs,
+        batch_size=args.batch_size,
+        diff_threshold=args.diff_threshold,
+        max_frames=args.max_frames,
+        log=not args.dry_run,
+        on_event=print
+    )
+
+    print(
+        f"frames in: {stats['frames_in']}  sampled: {stats['frames_sampled']}  "
+        f"inferred: {stats['frames_inferred']}  windows: {stats['windows']}  "
+        f"latency: {stats['ms_per_inferred_frame']} ms/frame  wall: {stats['wall_secs']}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
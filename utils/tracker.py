@@ -0,0 +1,181 @@
+import os
+
+import numpy as np
+
+
+# ---------- tracker config (env) ----------
+HIGH_CONF = float(os.getenv("TRACK_HIGH_CONF", "0.5"))
+LOW_CONF = float(os.getenv("TRACK_LOW_CONF", "0.1"))
+IOU_MATCH = float(os.getenv("TRACK_IOU_MATCH", "0.3"))
+# a track survives this many inferred frames without a match
+MAX_MISSES = int(os.getenv("TRACK_MAX_MISSES", "10"))
+# matches needed before a track counts as a real vehicle
+MIN_HITS = int(os.getenv("TRACK_MIN_HITS", "2"))
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between (N,4) and (M,4) xyxy boxes."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def centroid_cost(a, b):
+    """Centroid distance divided by the track box diagonal (N,M)."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+
+    ca = (a[:, :2] + a[:, 2:]) / 2
+    cb = (b[:, :2] + b[:, 2:]) / 2
+    diag = np.hypot(a[:, 2] - a[:, 0], a[:, 3] - a[:, 1])
+    return np.linalg.norm(ca[:, None] - cb[None], axis=2) / (diag[:, None] + 1e-9)
+
+
+def greedy_match(score, threshold, higher_is_better=True):
+    """Greedy one-to-one assignment → [(row, col)] with score past threshold."""
+    if score.size == 0:
+        return []
+
+    s = score if higher_is_better else -score
+    t = threshold if higher_is_better else -threshold
+
+    pairs = []
+    used_r, used_c = set(), set()
+    for idx in np.argsort(-s, axis=None):
+        r, c = np.unravel_index(idx, s.shape)
+        if s[r, c] < t:
+            break
+        if r in used_r or c in used_c:
+            continue
+        used_r.add(r)
+        used_c.add(c)
+        pairs.append((int(r), int(c)))
+    return pairs
+
+
+class Track:
+    def __init__(self, track_id, box, t):
+        self.id = track_id
+        self.box = box
+        self.hits = 1
+        self.misses = 0
+        self.first_seen = t
+        self.last_seen = t
+        self.confirmed_at = None
+
+
+class VehicleTracker:
+    """
+    ByteTrack-style IoU tracker (CPU, no appearance model).
+    High-confidence detections are matched to tracks first, then
+    low-confidence ones recover tracks that would otherwise be lost; a
+    centroid-distance pass covers low frame rates where boxes stop
+    overlapping between sampled frames.
+    """
+
+    def __init__(self, high_conf=HIGH_CONF, low_conf=LOW_CONF, iou_match=IOU_MATCH,
+                 max_misses=MAX_MISSES, min_hits=MIN_HITS, max_centroid_cost=1.0):
+        self.high_conf = high_conf
+        self.low_conf = low_conf
+        self.iou_match = iou_match
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.max_centroid_cost = max_centroid_cost
+
+        self.tracks = []
+        self._next_id = 1
+        # confirmed track id → time it was confirmed
+        self.confirmed = {}
+
+    def _associate(self, tracks, boxes):
+        """Match by IoU, then by centroid distance for what is left."""
+        if not tracks or len(boxes) == 0:
+            return [], list(range(len(tracks))), list(range(len(boxes)))
+
+        tb = np.array([t.box for t in tracks])
+        pairs = greedy_match(iou_matrix(tb, boxes), self.iou_match)
+
+        left_t = [i for i in range(len(tracks)) if i not in {p[0] for p in pairs}]
+        left_d = [j for j in range(len(boxes)) if j not in {p[1] for p in pairs}]
+
+        if left_t and left_d:
+            cost = centroid_cost(tb[left_t], boxes[left_d])
+            for r, c in greedy_match(cost, self.max_centroid_cost, higher_is_better=False):
+                pairs.append((left_t[r], left_d[c]))
+            left_t = [i for i in range(len(tracks)) if i not in {p[0] for p in pairs}]
+            left_d = [j for j in range(len(boxes)) if j not in {p[1] for p in pairs}]
+
+        return pairs, left_t, left_d
+
+    def _hit(self, track, box, t):
+        track.box = box
+        track.hits += 1
+        track.misses = 0
+        track.last_seen = t
+        if track.confirmed_at is None and track.hits >= self.min_hits:
+            track.confirmed_at = t
+            self.confirmed[track.id] = t
+
+    def update(self, boxes, confs, t):
+        """
+        Feed one frame of detections.
+        boxes → (N,4) xyxy, confs → (N,), t → frame time in seconds
+        Returns the confirmed tracks visible in this frame.
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        confs = np.asarray(confs, dtype=float).reshape(-1)
+
+        high = boxes[confs >= self.high_conf]
+        low = boxes[(confs >= self.low_conf) & (confs < self.high_conf)]
+
+        # stage 1: every track vs confident detections
+        pairs, left_t, left_d = self._associate(self.tracks, high)
+        for ti, di in pairs:
+            self._hit(self.tracks[ti], high[di], t)
+
+        # stage 2: still-unmatched tracks vs weak detections (occlusion, blur)
+        remaining = [self.tracks[i] for i in left_t]
+        pairs2, left_t2, _ = self._associate(remaining, low)
+        for ti, di in pairs2:
+            self._hit(remaining[ti], low[di], t)
+
+        for i in left_t2:
+            remaining[i].misses += 1
+
+        # weak detections never start tracks
+        for di in left_d:
+            self.tracks.append(Track(self._next_id, high[di], t))
+            self._next_id += 1
+
+        self.tracks = [tr for tr in self.tracks if tr.misses <= self.max_misses]
+
+        return [
+            tr for tr in self.tracks
+            if tr.confirmed_at is not None and tr.misses == 0
+        ]
+
+    def unique_between(self, start, end):
+        """
+        Vehicles first confirmed in [start, end] — end is inclusive, so a
+        vehicle confirmed on a window's last frame counts in that window
+        (the next window starts at a later frame time).
+        """
+        return sum(1 for t in self.confirmed.values() if start <= t <= end)
+
+    def flow_rate(self, start, end):
+        """Unique vehicles per minute over [start, end] (see unique_between)."""
+        minutes = (end - start) / 60.0
+        return self.unique_between(start, end) / minutes if minutes > 0 else 0.0
+
+    def forget_before(self, t):
+        """Drop confirmation times older than t (keeps memory bounded)."""
+        self.confirmed = {k: v for k, v in self.confirmed.items() if v >= t}
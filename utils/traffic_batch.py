@@ -0,0 +1,139 @@
+import argparse
+import os
+import time
+import zipfile
+from datetime import datetime
+
+import cv2
+
+from databases.traffic_detection_db import insert_traffic_logs
+from utils.city_data import CITY_AREA_DATA
+from utils.detection_rules import congestion_level, is_peak_hour
+from utils.image_decode import decode_image
+from utils.inference_config import inference_settings, predict_kwargs
+from utils.model_registry import get_model
+from utils.runtime_tuning import inference_slot
+from utils.s3_uploader import encode_image, upload_image_async
+
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+BATCH_SIZE = int(os.getenv("TRAFFIC_BATCH_SIZE", "8"))
+
+
+# ---------- image sources ----------
+def iter_image_bytes(path):
+    """Yield (name, encoded bytes) from a directory or a .zip of images."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for name in sorted(zf.namelist()):
+                if name.lower().endswith(IMAGE_EXTS):
+                    yield name, zf.read(name)
+        return
+
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith(IMAGE_EXTS):
+            with open(os.path.join(path, name), "rb") as f:
+                yield name, f.read()
+
+
+def decode(data):
+    """Decode at no more than the traffic model's input size needs."""
+    return decode_image(data, inference_settings("traffic")["imgsz"])
+
+
+# ---------- batched detection ----------
+def detect_batch(images, batch_size=BATCH_SIZE):
+    """
+    Run the shared traffic YOLO model over images in batches.
+    images → iterable of (name, BGR array)
+    Yields (name, annotated image, vehicle count).
+    """
+    model = get_model("traffic")
+    kwargs = predict_kwargs("traffic")
+    chunk = []
+
+    def run(chunk):
+        with inference_slot():
+            results = model([img for _, img in chunk], verbose=False, **kwargs)
+        for (name, img), res in zip(chunk, results):
+            boxes = res.boxes
+            count = 0 if boxes is None else len(boxes)
+            if count:
+                for x1, y1, x2, y2 in boxes.xyxy.int().tolist():
+                    cv2.rectangle(img, (x1, y1), (x2, y2), (0, 200, 0), 3)
+            yield name, img, count
+
+    for name, img in images:
+        if img is None:
+            print(f"Skipping unreadable image: {name}")
+            continue
+        chunk.append((name, img))
+        if len(chunk) == batch_size:
+            yield from run(chunk)
+            chunk = []
+
+    if chunk:
+        yield from run(chunk)
+
+
+def run_batch(images, city, area, upload=True, batch_size=BATCH_SIZE):
+    """
+    Detect a batch of traffic images and log every result in one insert.
+    No alert emails are sent from batch runs.
+    Returns (results, stats) where results is a list of dicts.
+    """
+    lat, lon = CITY_AREA_DATA[city][area]
+    results, rows = [], []
+    start = time.perf_counter()
+
+    for name, img, count in detect_batch(images, batch_size):
+        now = datetime.now()
+        level = congestion_level(count)
+
+        image_url = None
+        if upload:
+            data, ext = encode_image(img)
+            image_url = upload_image_async(data, category="traffic", ext=ext)
+
+        rows.append((now, city, area, lat, lon, count, level, is_peak_hour(now), image_url))
+        results.append({"image": name, "vehicle_count": count, "congestion": level, "image_url": image_url})
+
+    infer_secs = time.perf_counter() - start
+    stored = insert_traffic_logs(rows) if rows else True
+    total_secs = time.perf_counter() - start
+
+    stats = {
+        "images": len(results),
+        "secs": round(total_secs, 2),
+        "images_per_sec": round(len(results) / infer_secs, 2) if infer_secs > 0 else 0.0,
+        "stored": stored,
+    }
+    return results, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch traffic detection over camera snapshots")
+    parser.add_argument("path", help="directory or .zip of images")
+    parser.add_argument("--city", required=True, choices=list(CITY_AREA_DATA))
+    parser.add_argument("--area", required=True)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--no-upload", action="store_true", help="skip S3 uploads of annotated images")
+    args = parser.parse_args()
+
+    if args.area not in CITY_AREA_DATA[args.city]:
+        parser.error(f"area must be one of {list(CITY_AREA_DATA[args.city])}")
+
+    images = ((name, decode(data)) for name, data in iter_image_bytes(args.path))
+    results, stats = run_batch(
+        images, args.city, args.area,
+        upload=not args.no_upload, batch_size=args.batch_size
+    )
+
+    for r in results:
+        print(f"{r['image']}: {r['vehicle_count']} vehicles ({r['congestion']})")
+    print(f"{stats['images']} images in {stats['secs']}s — {stats['images_per_sec']} images/sec"
+          f" — stored: {stats['stored']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+
+from utils.crowd_export import load_images
+from utils.inference_config import predict_kwargs
+from utils.model_loader import ensure_model, publish_model
+from utils.model_registry import MODEL_SPECS, onnx_path
+
+
+YOLO_MODELS = [name for name, spec in MODEL_SPECS.items() if spec["kind"] == "yolo"]
+EXPORT_IMGSZ = int(os.getenv("YOLO_EXPORT_IMGSZ", "640"))
+
+
+# ---------- export ----------
+def export_onnx(name, imgsz=EXPORT_IMGSZ, upload=True):
+    """
+    Export one detector's .pt weights to ONNX next to the original
+    (models/x.pt → models/x.onnx) and publish it under the same S3 key.
+    """
+    from ultralytics import YOLO
+
+    pt = MODEL_SPECS[name]["path"]
+    ensure_model(pt, pt)
+
+    # dynamic axes keep batched inference (traffic_batch, stream_ingest) working
+    exported = YOLO(pt).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+
+    dest = onnx_path(pt)
+    if os.path.abspath(exported) != os.path.abspath(dest):
+        shutil.move(exported, dest)
+
+    if upload:
+        publish_model(dest, dest)
+    return dest
+
+
+# ---------- parity / latency ----------
+def _run(model, images, kwargs):
+    """(box count per image, seconds per image)."""
+    counts, timings = [], []
+    for _, img in images:
+        start = time.perf_counter()
+        res = model(img, verbose=False, **kwargs)[0]
+        timings.append(time.perf_counter() - start)
+        counts.append(0 if res.boxes is None else len(res.boxes))
+    return np.array(counts), np.array(timings)
+
+
+def compare(name, images, runs=3):
+    """
+    .pt vs .onnx for one detector on the same images.
+    Returns a row dict with latency per backend and box-count parity.
+    """
+    from ultralytics import YOLO
+
+    pt = MODEL_SPECS[name]["path"]
+    row = {"model": name}
+    counts = {}
+    # the settings the pages run with
+    kwargs = predict_kwargs(name)
+
+    for backend, path in (("pt", pt), ("onnx", onnx_path(pt))):
+        model = YOLO(path, task="detect")
+        # warm-up: predictor setup and first-call graph optimisation
+        model(images[0][1], verbose=False, **kwargs)
+
+        timings = []
+        for _ in range(runs):
+            counts[backend], t = _run(model, images, kwargs)
+            timings.extend(t)
+        row[f"{backend}_ms"] = round(1000 * float(np.mean(timings)), 1)
+
+    diff = np.abs(counts["pt"] - counts["onnx"])
+    row["speedup"] = round(row["pt_ms"] / row["onnx_ms"], 2) if row["onnx_ms"] else None
+    row["count_match"] = round(float(np.mean(diff == 0)), 3)
+    row["max_count_diff"] = int(diff.max())
+    return row
+
+
+def print_table(rows):
+    cols = ["model", "pt_ms", "onnx_ms", "speedup", "count_match", "max_count_diff"]
+    print("  ".join(f"{c:>14}" for c in cols))
+    for row in rows:
+        print("  ".join(f"{str(row[c]):>14}" for c in cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the YOLO detectors to ONNX and check parity / latency")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_export = sub.add_parser("export", help="write models/*.onnx next to the .pt and upload to S3")
+    p_export.add_argument("models", nargs="*", default=YOLO_MODELS, help=f"default: {' '.join(YOLO_MODELS)}")
+    p_export.add_argument("--imgsz", type=int, default=EXPORT_IMGSZ)
+    p_export.add_argument("--no-upload", action="store_true")
+
+    p_check = sub.add_parser("check", help="box-count parity and latency, .pt vs .onnx")
+    p_check.add_argument("images", nargs="+")
+    p_check.add_argument("--models", default=",".join(YOLO_MODELS))
+    p_check.add_argument("--runs", type=int, default=3)
+    p_check.add_argument("--min-match", type=float, default=0.95,
+                         help="exit 1 if fewer images than this have equal box counts")
+
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        for name in args.models:
+            if name not in YOLO_MODELS:
+                parser.error(f"models must be among {YOLO_MODELS}")
+            print(f"{name}: {export_onnx(name, args.imgsz, upload=not args.no_upload)}")
+        return
+
+    images = load_images(args.images)
+    if not images:
+        parser.error("no readable images")
+
+    rows = [compare(name, images, args.runs) for name in args.models.split(",") if name]
+    print_table(rows)
+    raise SystemExit(0 if all(r["count_match"] >= args.min_match for r in rows) else 1)
+
+
+if __name__ == "__main__":
+    main()